@@ -10,6 +10,19 @@ from mixpy import (
     at_head, at_exception, at_invoke,
 )
 
+# The client module must not be imported before these mixins register (it
+# would load unwoven), so Response is resolved on first use and kept here.
+_Response = None
+
+
+def _response(status, body):
+    global _Response
+    if _Response is None:
+        from demo_game.network.client import Response
+        _Response = Response
+    return _Response(status=status, body=body)
+
+
 # ---------------------------------------------------------------------------
 # HTTP Client patches
 # ---------------------------------------------------------------------------
@@ -22,8 +35,7 @@ class HTTPClientPatch:
         at=At(type=TYPE.HEAD, name=None, location=Loc(condition=When("args[0]", OP.EQ, "/blocked"))),
     )
     def block_path(self, ci, path, *args, **kw):
-        from demo_game.network.client import Response
-        ci.cancel(result=Response(status=403, body="Forbidden"))
+        ci.cancel(result=_response(403, "Forbidden"))
 
     @inject(
         method="post",
@@ -37,10 +49,9 @@ class HTTPClientPatch:
         at=at_exception(),
     )
     def retry_on_error(self, ci):
-        exc = ci.get_context().get("exception")
+        exc = ci.exception
         if isinstance(exc, (ConnectionError, OSError)):
-            from demo_game.network.client import Response
-            ci.cancel(result=Response(status=503, body="Service Unavailable (injected fallback)"))
+            ci.cancel(result=_response(503, "Service Unavailable (injected fallback)"))
 
     @inject(
         method="get",
@@ -48,8 +59,7 @@ class HTTPClientPatch:
               selector=CallSelector(func=QualifiedSelector.of("self", "request_log", "append"), args=(ArgAny(),))),
     )
     def enrich_request_log(self, ci, entry):
-        enriched = dict(entry)
-        enriched["_mixpy"] = True
+        enriched = {**entry, "_mixpy": True}
         ci.cancel(result=self.request_log.append(enriched))
 
 
@@ -81,6 +91,6 @@ class SocketClientPatch:
         at=at_exception(),
     )
     def handle_send_error(self, ci):
-        exc = ci.get_context().get("exception")
+        exc = ci.exception
         if isinstance(exc, ConnectionError):
             ci.cancel(result=-1)
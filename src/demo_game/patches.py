@@ -26,7 +26,8 @@ class PlayerCombatPatch:
             type=TYPE.INVOKE,
             name="self.calculate_physics",
             selector=CallSelector(func=QualifiedSelector.of("self","calculate_physics"), args=(ArgAny(),))
-        )
+        ),
+        fast_guard=lambda self: not self.is_in_space,
     )
     def redirect_physics(self, ci, x):
         if self.is_in_space:
@@ -45,7 +46,8 @@ class PlayerCombatPatch:
                     inclusive=False
                 )
             )
-        )
+        ),
+        fast_guard=lambda self: not self.is_in_space,
     )
     def redirect_second_call_only(self, ci, x):
         if self.is_in_space:
@@ -166,17 +168,16 @@ class PlayerCombatPatch:
 
     @inject(method="score", at=At(type=TYPE.TAIL, name=None), priority=10)
     def double_score(self, ci, *args, **kw):
-        ci.set_return_value(ci.get_context().get("return_value", 0) * 2)
+        ci.set_return_value(ci.return_value * 2)
 
     @inject(method="score", at=At(type=TYPE.TAIL, name=None), priority=20)
     def add_bonus(self, ci, *args, **kw):
         # runs after double_score because priority=20 > 10; set_return_value lets this run
-        current = ci.new_value if ci.value_set else ci.get_context().get("return_value", 0)
-        ci.set_return_value(current + 1)
+        ci.set_return_value(ci.current_return_value() + 1)
 
     @inject(method="risky_divide", at=at_exception())
     def handle_divide_error(self, ci):
-        exc = ci.get_context().get("exception")
+        exc = ci.exception
         if isinstance(exc, ZeroDivisionError):
             ci.cancel(result=-1)
 
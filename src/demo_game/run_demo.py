@@ -4,53 +4,73 @@ import argparse
 import os
 import pathlib
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Callable, Iterable, Sequence, TextIO
 
 
-@dataclass(frozen=True)
+# Bound by bootstrap_runtime() once the import hook is installed, so the
+# scenarios share the woven classes instead of re-importing them per call.
+Player: type | None = None
+HTTPClient: type | None = None
+Response: type | None = None
+SocketClient: type | None = None
+
+
+@dataclass(frozen=True, slots=True)
 class Check:
     label: str
     actual: object
     expected: object
+    # compared once at construction; reporting reads the stored result
+    passed: bool = field(init=False)
 
-    @property
-    def passed(self) -> bool:
-        return self.actual == self.expected
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "passed", self.actual == self.expected)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Scenario:
     key: str
     title: str
     run: Callable[[], list[Check]]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RunSummary:
     scenarios_run: int
     checks_total: int
     checks_failed: int
 
 
+_bootstrapped = False
+
+
 def bootstrap_runtime() -> None:
+    global _bootstrapped
+    if _bootstrapped:
+        return
     os.environ.setdefault("MIXIN_DEBUG", "False")
 
     src = pathlib.Path(__file__).resolve().parents[2]
-    for p in (str(src), str(src.parent)):
-        if p not in sys.path:
-            sys.path.insert(0, p)
+    existing = set(sys.path)
+    sys.path[:0] = [p for p in (str(src.parent), str(src)) if p not in existing]
 
     import mixpy
     import demo_game.patches  # noqa: F401  # ensures injectors are registered
     import demo_game.network.patches  # noqa: F401  # networking injectors
 
     mixpy.init()
+    _load_demo_classes()
+    _bootstrapped = True
 
 
-def _scenario_attribute_guard() -> list[Check]:
+def _load_demo_classes() -> None:
+    global Player, HTTPClient, Response, SocketClient
     from demo_game.game.player.player import Player
+    from demo_game.network.client import HTTPClient, Response, SocketClient
+
 
+def _scenario_attribute_guard() -> list[Check]:
     player = Player(10)
     first = player.set_health(5)
     first_health = player.health
@@ -65,8 +85,6 @@ def _scenario_attribute_guard() -> list[Check]:
 
 
 def _scenario_parameter_clamp() -> list[Check]:
-    from demo_game.game.player.player import Player
-
     player = Player(10)
     first = player.set_health2(7)
     first_health = player.health
@@ -81,15 +99,11 @@ def _scenario_parameter_clamp() -> list[Check]:
 
 
 def _scenario_const_rewrite() -> list[Check]:
-    from demo_game.game.player.player import Player
-
     player = Player(10)
     return [Check("calculate_speed()", player.calculate_speed(), 3.0)]
 
 
 def _scenario_invoke_redirect() -> list[Check]:
-    from demo_game.game.player.player import Player
-
     player = Player(10)
     player.is_in_space = False
     normal = player.update(3)
@@ -102,8 +116,6 @@ def _scenario_invoke_redirect() -> list[Check]:
 
 
 def _scenario_anchor_second_call() -> list[Check]:
-    from demo_game.game.player.player import Player
-
     player = Player(10)
     player.is_in_space = False
     normal = player.two_calls(3)
@@ -116,8 +128,6 @@ def _scenario_anchor_second_call() -> list[Check]:
 
 
 def _scenario_slice_filters() -> list[Check]:
-    from demo_game.game.player.player import Player
-
     player = Player(10)
     return [
         Check("slice_demo(3)", player.slice_demo(3), 3.0),
@@ -126,15 +136,11 @@ def _scenario_slice_filters() -> list[Check]:
 
 
 def _scenario_near_filter() -> list[Check]:
-    from demo_game.game.player.player import Player
-
     player = Player(10)
     return [Check("near_demo(3)", player.near_demo(3), 7.0)]
 
 
 def _scenario_kwargs_policies() -> list[Check]:
-    from demo_game.game.player.player import Player
-
     player = Player(10)
     return [
         Check("kw_call_literal(2)", player.kw_call_literal(2), 999),
@@ -143,8 +149,6 @@ def _scenario_kwargs_policies() -> list[Check]:
 
 
 def _scenario_head_kwargs_condition() -> list[Check]:
-    from demo_game.game.player.player import Player
-
     player = Player(10)
     return [
         Check("accept_kwargs(2, scale=7)", player.accept_kwargs(2, scale=7), 7777),
@@ -153,8 +157,6 @@ def _scenario_head_kwargs_condition() -> list[Check]:
 
 
 def _scenario_tail_implicit_return() -> list[Check]:
-    from demo_game.game.player.player import Player
-
     player = Player(10)
     return [Check("do_nothing()", player.do_nothing(), 123)]
 
@@ -164,8 +166,6 @@ def _scenario_tail_implicit_return() -> list[Check]:
 # ---------------------------------------------------------------------------
 
 def _scenario_http_head_block() -> list[Check]:
-    from demo_game.network.client import HTTPClient
-
     client = HTTPClient()
     r_ok = client.get("/api/data")
     r_blocked = client.get("/blocked")
@@ -177,8 +177,6 @@ def _scenario_http_head_block() -> list[Check]:
 
 
 def _scenario_http_param_default_body() -> list[Check]:
-    from demo_game.network.client import HTTPClient
-
     client = HTTPClient()
     r_empty = client.post("/api/items", body="")
     r_full = client.post("/api/items", body='{"name":"x"}')
@@ -189,8 +187,6 @@ def _scenario_http_param_default_body() -> list[Check]:
 
 
 def _scenario_http_exception_fallback() -> list[Check]:
-    from demo_game.network.client import HTTPClient, Response
-
     # Override get so fetch triggers ConnectionError (to exercise EXCEPTION injection)
     class _BrokenHTTPClient(HTTPClient):
         def get(self, path: str, headers=None) -> Response:  # type: ignore[override]
@@ -204,8 +200,6 @@ def _scenario_http_exception_fallback() -> list[Check]:
 
 
 def _scenario_socket_send_guard() -> list[Check]:
-    from demo_game.network.client import SocketClient
-
     sock = SocketClient()
     sock.connect()
     n = sock.send(b"hello")
@@ -222,41 +216,43 @@ def _scenario_socket_send_guard() -> list[Check]:
     ]
 
 
-def available_scenarios() -> list[Scenario]:
-    return [
-        Scenario("attribute-guard", "ATTRIBUTE blocks negative writes", _scenario_attribute_guard),
-        Scenario("parameter-clamp", "PARAMETER clamps negative input", _scenario_parameter_clamp),
-        Scenario("const-rewrite", "CONST rewrites literal values", _scenario_const_rewrite),
-        Scenario("invoke-redirect", "INVOKE redirects update call in space", _scenario_invoke_redirect),
-        Scenario("anchor-second", "Anchor selects only second matched call", _scenario_anchor_second_call),
-        Scenario("slice-filters", "Slice limits constant rewrites", _scenario_slice_filters),
-        Scenario("near-filter", "Near constraint applies by statement distance", _scenario_near_filter),
-        Scenario("kwargs-policies", "Selector kwargs + **kwargs policy behavior", _scenario_kwargs_policies),
-        Scenario("head-kwargs", "HEAD condition can read kwargs", _scenario_head_kwargs_condition),
-        Scenario("tail-implicit", "TAIL can override implicit return", _scenario_tail_implicit_return),
-        # Networking demos
-        Scenario("net-http-block", "HEAD blocks specific HTTP path", _scenario_http_head_block),
-        Scenario("net-http-body", "PARAMETER fills empty POST body", _scenario_http_param_default_body),
-        Scenario("net-http-exception", "EXCEPTION fallback on connection failure", _scenario_http_exception_fallback),
-        Scenario("net-socket-guard", "PARAMETER + EXCEPTION guard socket.send()", _scenario_socket_send_guard),
-    ]
+# The scenario set is static, so it and its key map are built once at import.
+_SCENARIOS: tuple[Scenario, ...] = (
+    Scenario("attribute-guard", "ATTRIBUTE blocks negative writes", _scenario_attribute_guard),
+    Scenario("parameter-clamp", "PARAMETER clamps negative input", _scenario_parameter_clamp),
+    Scenario("const-rewrite", "CONST rewrites literal values", _scenario_const_rewrite),
+    Scenario("invoke-redirect", "INVOKE redirects update call in space", _scenario_invoke_redirect),
+    Scenario("anchor-second", "Anchor selects only second matched call", _scenario_anchor_second_call),
+    Scenario("slice-filters", "Slice limits constant rewrites", _scenario_slice_filters),
+    Scenario("near-filter", "Near constraint applies by statement distance", _scenario_near_filter),
+    Scenario("kwargs-policies", "Selector kwargs + **kwargs policy behavior", _scenario_kwargs_policies),
+    Scenario("head-kwargs", "HEAD condition can read kwargs", _scenario_head_kwargs_condition),
+    Scenario("tail-implicit", "TAIL can override implicit return", _scenario_tail_implicit_return),
+    # Networking demos
+    Scenario("net-http-block", "HEAD blocks specific HTTP path", _scenario_http_head_block),
+    Scenario("net-http-body", "PARAMETER fills empty POST body", _scenario_http_param_default_body),
+    Scenario("net-http-exception", "EXCEPTION fallback on connection failure", _scenario_http_exception_fallback),
+    Scenario("net-socket-guard", "PARAMETER + EXCEPTION guard socket.send()", _scenario_socket_send_guard),
+)
+_SCENARIO_MAP: dict[str, Scenario] = {scenario.key: scenario for scenario in _SCENARIOS}
+
+
+def available_scenarios() -> tuple[Scenario, ...]:
+    return _SCENARIOS
 
 
 def _ordered_unique(items: Iterable[str]) -> list[str]:
-    out: list[str] = []
-    seen: set[str] = set()
-    for item in items:
-        if item not in seen:
-            seen.add(item)
-            out.append(item)
-    return out
+    return list(dict.fromkeys(items))
 
 
 def select_scenarios(scenarios: Sequence[Scenario], keys: Sequence[str] | None) -> list[Scenario]:
     if not keys:
         return list(scenarios)
 
-    scenario_map = {scenario.key: scenario for scenario in scenarios}
+    if scenarios is _SCENARIOS:
+        scenario_map = _SCENARIO_MAP
+    else:
+        scenario_map = {scenario.key: scenario for scenario in scenarios}
     requested = _ordered_unique(keys)
     unknown = [key for key in requested if key not in scenario_map]
     if unknown:
@@ -266,10 +262,15 @@ def select_scenarios(scenarios: Sequence[Scenario], keys: Sequence[str] | None)
     return [scenario_map[key] for key in requested]
 
 
-def _print_header(scenarios: Sequence[Scenario], stream: TextIO) -> None:
-    print("MixPy Demo", file=stream)
-    print(f"Running {len(scenarios)} scenario(s)...", file=stream)
-    print("-" * 72, file=stream)
+_RULE = "-" * 72
+
+
+def _header_lines(scenarios: Sequence[Scenario]) -> list[str]:
+    return [
+        "MixPy Demo",
+        f"Running {len(scenarios)} scenario(s)...",
+        _RULE,
+    ]
 
 
 def run_selected_scenarios(scenarios: Sequence[Scenario], stream: TextIO | None = None) -> RunSummary:
@@ -279,26 +280,25 @@ def run_selected_scenarios(scenarios: Sequence[Scenario], stream: TextIO | None
     checks_total = 0
     checks_failed = 0
 
-    _print_header(scenarios, stream)
+    # Output is buffered per scenario and written in one call.
+    lines = _header_lines(scenarios)
     for scenario in scenarios:
-        print(f"[{scenario.key}] {scenario.title}", file=stream)
+        lines.append(f"[{scenario.key}] {scenario.title}")
         for check in scenario.run():
             checks_total += 1
-            status = "PASS" if check.passed else "FAIL"
-            if not check.passed:
+            ok = check.passed
+            status = "PASS" if ok else "FAIL"
+            if not ok:
                 checks_failed += 1
-            print(
-                f"  - [{status}] {check.label}: expected={check.expected!r}, actual={check.actual!r}",
-                file=stream,
-            )
-        print(file=stream)
+            lines.append(f"  - [{status}] {check.label}: expected={check.expected!r}, actual={check.actual!r}")
+        lines.append("")
+        stream.write("\n".join(lines) + "\n")
+        lines = []
 
     passed = checks_total - checks_failed
-    print("-" * 72, file=stream)
-    print(
-        f"Summary: {passed}/{checks_total} checks passed across {len(scenarios)} scenario(s).",
-        file=stream,
-    )
+    lines.append(_RULE)
+    lines.append(f"Summary: {passed}/{checks_total} checks passed across {len(scenarios)} scenario(s).")
+    stream.write("\n".join(lines) + "\n")
     return RunSummary(scenarios_run=len(scenarios), checks_total=checks_total, checks_failed=checks_failed)
 
 
@@ -315,17 +315,28 @@ def _build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _print_scenarios(scenarios: Sequence[Scenario]) -> int:
+    print("Available scenarios:")
+    for scenario in scenarios:
+        print(f"  - {scenario.key}: {scenario.title}")
+    return 0
+
+
 def main(argv: Sequence[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    # A bare --list needs no parser; any other argv takes the full path so
+    # errors and --help behave as before.
+    if list(argv) == ["--list"]:
+        return _print_scenarios(available_scenarios())
+
     parser = _build_parser()
     args = parser.parse_args(argv)
 
     scenarios = available_scenarios()
 
     if args.list:
-        print("Available scenarios:")
-        for scenario in scenarios:
-            print(f"  - {scenario.key}: {scenario.title}")
-        return 0
+        return _print_scenarios(scenarios)
 
     try:
         selected = select_scenarios(scenarios, args.scenarios)
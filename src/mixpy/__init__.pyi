@@ -43,6 +43,7 @@ def inject(
     require: int | None = ...,
     expect: int | None = ...,
     policy: POLICY = ...,
+    fast_guard: Callable[[Any], bool] | None = ...,
 ) -> Callable[[Callable[..., Any]], Callable[..., Any]]: ...
 
 # ---------------------------------------------------------------------------
@@ -6,8 +6,10 @@ from typing import Any, Callable
 
 from .builtin_handlers import install_builtin_handlers
 from .hook import install_import_hook
-from .model import At, Loc, POLICY, TYPE
+from .introspect import const_action, is_noop, may_cancel, may_set_value, uses_context, uses_locals
+from .model import At, Loc, POLICY, TYPE, canonical
 from .registry import InjectorSpec, REGISTRY
+from .runtime import _compiled_when, refresh_trace_flag
 
 
 def target_path(target: str | type) -> str:
@@ -50,6 +52,7 @@ def configure(*, debug: bool | None = None, trace: bool | None = None, source_du
         os.environ["MIXIN_DEBUG"] = "True" if debug else "False"
     if trace is not None:
         os.environ["MIXIN_TRACE"] = "True" if trace else "False"
+        refresh_trace_flag()
     if source_dump_dir is not None:
         from .debug import set_dump_dir
         set_dump_dir(source_dump_dir if source_dump_dir else None)
@@ -108,6 +111,7 @@ def inject(
     require: int | None = None,
     expect: int | None = None,
     policy: POLICY = POLICY.ERROR,
+    fast_guard: Callable[[Any], bool] | None = None,
 ):
     if not isinstance(method, str) or not method.strip():
         raise ValueError("method must be a non-empty string.")
@@ -115,6 +119,13 @@ def inject(
         raise TypeError("at must be an At(...) instance.")
     if not isinstance(policy, POLICY):
         raise TypeError("policy must be a POLICY enum value.")
+    if fast_guard is not None and at.type != TYPE.INVOKE:
+        raise ValueError("fast_guard is only supported for INVOKE injection points.")
+    # Share one At per distinct descriptor, and compile its condition now so
+    # weaving reuses the cached predicate (and a bad When fails here).
+    at = canonical(at)
+    if at.condition is not None:
+        _compiled_when(at.condition)
 
     def deco(fn: Callable):
         # The runtime callback signature used by handlers is (ci, *args, **kwargs)
@@ -127,6 +138,13 @@ def inject(
             require=require,
             expect=expect,
             policy=policy,
+            uses_context=uses_context(fn),
+            uses_locals=uses_locals(fn),
+            may_cancel=may_cancel(fn),
+            may_set_value=may_set_value(fn),
+            const_action=const_action(fn),
+            noop=require is None and expect is None and is_noop(fn),
+            fast_guard=fast_guard,
         )
         fn.__inject_spec__ = spec
         return fn
@@ -135,36 +153,36 @@ def inject(
 
 
 def at_head(*, location: Loc | None = None) -> At:
-    return At(type=TYPE.HEAD, name=None, location=location)
+    return canonical(At(type=TYPE.HEAD, name=None, location=location))
 
 
 def at_tail(*, location: Loc | None = None) -> At:
-    return At(type=TYPE.TAIL, name=None, location=location)
+    return canonical(At(type=TYPE.TAIL, name=None, location=location))
 
 
 def at_parameter(name: str, *, location: Loc | None = None) -> At:
-    return At(type=TYPE.PARAMETER, name=name, location=location)
+    return canonical(At(type=TYPE.PARAMETER, name=name, location=location))
 
 
 def at_const(value: Any, *, location: Loc | None = None) -> At:
-    return At(type=TYPE.CONST, name=value, location=location)
+    return canonical(At(type=TYPE.CONST, name=value, location=location))
 
 
 def at_invoke(name: str, *, selector: Any = None, location: Loc | None = None) -> At:
-    return At(type=TYPE.INVOKE, name=name, selector=selector, location=location)
+    return canonical(At(type=TYPE.INVOKE, name=name, selector=selector, location=location))
 
 
 def at_attribute(name: str, *, location: Loc | None = None) -> At:
-    return At(type=TYPE.ATTRIBUTE, name=name, location=location)
+    return canonical(At(type=TYPE.ATTRIBUTE, name=name, location=location))
 
 
 def at_exception(*, location: Loc | None = None) -> At:
-    return At(type=TYPE.EXCEPTION, name=None, location=location)
+    return canonical(At(type=TYPE.EXCEPTION, name=None, location=location))
 
 
 def at_yield(*, location: Loc | None = None) -> At:
     """Return an :class:`~mixpy.At` descriptor for YIELD injection points."""
-    return At(type=TYPE.YIELD, name=None, location=location)
+    return canonical(At(type=TYPE.YIELD, name=None, location=location))
 
 
 def inject_head(
@@ -241,6 +259,7 @@ def inject_invoke(
     require: int | None = None,
     expect: int | None = None,
     policy: POLICY = POLICY.ERROR,
+    fast_guard: Callable[[Any], bool] | None = None,
 ):
     return inject(
         method=method,
@@ -249,6 +268,7 @@ def inject_invoke(
         require=require,
         expect=expect,
         policy=policy,
+        fast_guard=fast_guard,
     )
 
 
@@ -3,6 +3,15 @@ from typing import Any, Callable, Dict, List, Tuple
 import mixpy.runtime as mixpy_runtime
 import mixpy.model as mixpy_model
 
+# Site evaluators called from woven code, bound as module globals so each hit
+# is a single global load instead of ``mixpy_runtime.<attr>``.
+SITE_EVALUATORS = {
+    "__mixin_eval_const__": "eval_const_site",
+    "__mixin_eval_invoke__": "eval_invoke_site",
+    "__mixin_eval_attr_write__": "eval_attr_write_site",
+    "__mixin_eval_yield__": "eval_yield_site",
+}
+
 def ensure_module_globals(globals_dict: Dict[str, Any]) -> None:
     # runtime + model shortcuts
     globals_dict.setdefault("mixpy_runtime", mixpy_runtime)
@@ -10,10 +19,14 @@ def ensure_module_globals(globals_dict: Dict[str, Any]) -> None:
 
     # injector mapping: key=(target, method, type_name, at_name) -> [callables...]
     globals_dict.setdefault("__mixin_injectors__", {})
+    # fast_guard mapping: same keys, only for sites where every injector has a guard
+    globals_dict.setdefault("__mixin_guards__", {})
 
     # helpers
     globals_dict.setdefault("__mixin_invoke__", _mixin_invoke_wrapper)
     globals_dict.setdefault("__mixin_attr_write__", _mixin_attr_write_wrapper)
+    for name, attr in SITE_EVALUATORS.items():
+        globals_dict.setdefault(name, getattr(mixpy_runtime, attr))
 
 def _mixin_invoke_wrapper(call_original: Callable[[], Any], pre_stmts_ignored):
     # pre_stmts are inserted as statements inline in transformed AST, so ignored here.
@@ -1,97 +1,167 @@
 from __future__ import annotations
 
 import ast
+import copy
 from typing import Any, Dict, List, Optional, Tuple
 
-from .model import TYPE, At
-from .handlers import Match, register_handler
+from .model import OP, TYPE, At, When
+from .handlers import GUARD_PREFIX, Match, invalidate_index, node_index, register_handlers, site_guarded, site_name
 from .registry import InjectorSpec
-from .location_utils import _dotted_name_from_attribute
+from .location_utils import _attr_path_is
 from .selector import CallSelector
 
+# Expression contexts carry no state, so one instance serves every woven node.
+_LOAD = ast.Load()
+_STORE = ast.Store()
+
+def _rt_attr(attr: str) -> ast.Attribute:
+    return ast.Attribute(value=ast.Name(id="mixpy_runtime", ctx=_LOAD), attr=attr, ctx=_LOAD)
+
 def _self_expr(fn: ast.FunctionDef) -> ast.expr:
     if fn.args.args:
-        return ast.Name(id=fn.args.args[0].arg, ctx=ast.Load())
+        return ast.Name(id=fn.args.args[0].arg, ctx=_LOAD)
     return ast.Constant(value=None)
 
-def _fn_pos_args(fn: ast.FunctionDef) -> List[ast.arg]:
-    return list(fn.args.posonlyargs) + list(fn.args.args)
-
-def _fn_user_args_exprs(fn: ast.FunctionDef) -> List[ast.expr]:
-    args = _fn_pos_args(fn)
-    if args and args[0].arg == "self":
-        args = args[1:]
-    return [ast.Name(id=a.arg, ctx=ast.Load()) for a in args]
+def _append_user_arg_names(out: List[ast.expr], fn: ast.FunctionDef) -> List[ast.expr]:
+    # positional parameters (posonly first), minus a leading ``self``
+    skip_self = True
+    for params in (fn.args.posonlyargs, fn.args.args):
+        for a in params:
+            if skip_self:
+                skip_self = False
+                if a.arg == "self":
+                    continue
+            out.append(ast.Name(id=a.arg, ctx=_LOAD))
+    return out
 
 def _build_args_list_expr(fn: ast.FunctionDef) -> ast.expr:
-    elts: List[ast.expr] = _fn_user_args_exprs(fn)
+    elts = _append_user_arg_names([], fn)
     if fn.args.vararg is not None:
-        elts.append(ast.Starred(value=ast.Call(func=ast.Name(id="list", ctx=ast.Load()),
-                                               args=[ast.Name(id=fn.args.vararg.arg, ctx=ast.Load())],
-                                               keywords=[]),
-                                ctx=ast.Load()))
-    return ast.List(elts=elts, ctx=ast.Load())
+        # the list display unpacks the vararg tuple itself
+        elts.append(ast.Starred(value=ast.Name(id=fn.args.vararg.arg, ctx=_LOAD), ctx=_LOAD))
+    return ast.List(elts=elts, ctx=_LOAD)
 
 def _build_kwargs_dict_expr(fn: ast.FunctionDef) -> ast.expr:
     if fn.args.kwarg is not None:
-        return ast.Call(func=ast.Name(id="dict", ctx=ast.Load()),
-                        args=[ast.Name(id=fn.args.kwarg.arg, ctx=ast.Load())],
+        return ast.Call(func=ast.Name(id="dict", ctx=_LOAD),
+                        args=[ast.Name(id=fn.args.kwarg.arg, ctx=_LOAD)],
                         keywords=[])
     return ast.Dict(keys=[], values=[])
 
 def _dispatch_call_args_for_fn(fn: ast.FunctionDef) -> Tuple[List[ast.expr], List[ast.keyword]]:
     # positional: self, then user args, then *vararg if present
-    args: List[ast.expr] = [_self_expr(fn), *_fn_user_args_exprs(fn)]
+    args = _append_user_arg_names([_self_expr(fn)], fn)
     if fn.args.vararg is not None:
-        args.append(ast.Starred(value=ast.Name(id=fn.args.vararg.arg, ctx=ast.Load()), ctx=ast.Load()))
+        args.append(ast.Starred(value=ast.Name(id=fn.args.vararg.arg, ctx=_LOAD), ctx=_LOAD))
     keywords: List[ast.keyword] = []
     if fn.args.kwarg is not None:
-        keywords.append(ast.keyword(arg=None, value=ast.Name(id=fn.args.kwarg.arg, ctx=ast.Load())))
+        keywords.append(ast.keyword(arg=None, value=ast.Name(id=fn.args.kwarg.arg, ctx=_LOAD)))
     return args, keywords
 
-def _inj_key(target: str, method: str, type_name: str, at_name: Any) -> ast.Tuple:
-    return ast.Tuple(elts=[
-        ast.Constant(value=target),
-        ast.Constant(value=method),
-        ast.Constant(value=type_name),
-        ast.Constant(value=str(at_name)),
-    ], ctx=ast.Load())
+def _site_ref(fn: ast.AST, target: str, method: str, type_name: str, at_name: Any) -> ast.Name:
+    # Bound once per module by MixinTransformer; see handlers.SiteNames.
+    key = (target, method, type_name, str(at_name))
+    return ast.Name(id=site_name(fn, key), ctx=_LOAD)
 
-def _get_injectors_call(target: str, method: str, type_name: str, at_name: Any) -> ast.Call:
-    return ast.Call(
-        func=ast.Attribute(value=ast.Name(id="__mixin_injectors__", ctx=ast.Load()), attr="get", ctx=ast.Load()),
-        args=[_inj_key(target, method, type_name, at_name), ast.List(elts=[], ctx=ast.Load())],
-        keywords=[]
-    )
+def _guard_ref(fn: ast.AST, target: str, method: str, type_name: str, at_name: Any) -> ast.Name:
+    key = (target, method, type_name, str(at_name))
+    return ast.Name(id=site_name(fn, key, GUARD_PREFIX), ctx=_LOAD)
+
+def _needs_ctx(injectors: List[InjectorSpec]) -> bool:
+    # Conditions are evaluated against the context, so they always need it.
+    return any(s.uses_context or s.at.condition is not None for s in injectors)
+
+def _needs_locals(injectors: List[InjectorSpec]) -> bool:
+    return any(s.uses_locals or _when_reads_locals(s.at.condition) for s in injectors)
+
+def _when_reads_locals(cond: Optional[When]) -> bool:
+    if cond is None:
+        return False
+    if cond.op in (OP.AND, OP.OR):
+        return any(_when_reads_locals(c) for c in cond.right)
+    if cond.op == OP.NOT:
+        return _when_reads_locals(cond.right)
+    return cond.left == "locals" or cond.left.startswith(("locals.", "locals["))
+
+def _frame_ctx_base(fn: ast.FunctionDef, self_expr: ast.expr, injectors: List[InjectorSpec]) -> Dict[str, ast.expr]:
+    """Entries shared by every frame-level context; ``locals()`` only when someone reads it.
 
-def _mk_ci_ctor(type_member: str, target: str, method: str, at_name: Any) -> ast.Call:
+    Built once per instrumented function: the entries only load parameters,
+    so every site in the function can reuse the same nodes.
+    """
+    base = {
+        "self": self_expr,
+        "args": _build_args_list_expr(fn),
+        "kwargs": _build_kwargs_dict_expr(fn),
+    }
+    if _needs_locals(injectors):
+        base["locals"] = ast.Call(func=ast.Name(id="locals", ctx=_LOAD), args=[], keywords=[])
+    return base
+
+def _mk_frame_ctx(base: Dict[str, ast.expr], **extra: ast.expr) -> ast.Dict:
+    ctx = {**base, **extra}
+    return ast.Dict(keys=[ast.Constant(k) for k in ctx], values=list(ctx.values()))
+
+def _may_cancel(injectors: List[InjectorSpec]) -> bool:
+    return any(s.may_cancel for s in injectors)
+
+def _may_set_value(injectors: List[InjectorSpec]) -> bool:
+    return any(s.may_set_value for s in injectors)
+
+def _guarded(body: List[ast.stmt], cancel_guard: ast.stmt, value_guard: Optional[ast.stmt], injectors: List[InjectorSpec]) -> List[ast.stmt]:
+    # Drop the cancel / value_set checks no injector at this site can trigger.
+    if _may_cancel(injectors):
+        body.append(cancel_guard)
+    if value_guard is not None and _may_set_value(injectors):
+        body.append(value_guard)
+    return body
+
+def _const_action(injectors: List[InjectorSpec], kinds: Tuple[str, ...]) -> Optional[Tuple[str, Any]]:
+    # A lone unconditional injector whose body is ci.cancel(<literal>) /
+    # ci.set_value(<literal>) is woven as its effect, with no ci or dispatch.
+    if len(injectors) != 1:
+        return None
+    spec = injectors[0]
+    action = spec.const_action
+    if action is None or spec.at.condition is not None or action[0] not in kinds:
+        return None
+    return action
+
+def _rewrite_matches(fn: ast.FunctionDef, matches: List[Match], rewrite) -> None:
+    # Matched nodes are swapped through the slots recorded by the node index
+    # instead of re-walking the whole body with a NodeTransformer.
+    idx = node_index(fn)
+    nodes = [m.node for m in matches]
+    if any(id(n) not in idx.positions for n in nodes):
+        invalidate_index(fn)
+        idx = node_index(fn)
+    idx.replace_in_body(nodes, rewrite)
+
+def _mk_ci_ctor(type_member: str, target: str, method: str, at_name: Any, **fields: ast.expr) -> ast.Call:
     return ast.Call(
-        func=ast.Attribute(value=ast.Name(id="mixpy_runtime", ctx=ast.Load()), attr="CallbackInfo", ctx=ast.Load()),
+        func=_rt_attr("CallbackInfo"),
         args=[],
         keywords=[
             ast.keyword(arg="type", value=ast.Attribute(
-                value=ast.Attribute(value=ast.Name(id="mixpy_model", ctx=ast.Load()), attr="TYPE", ctx=ast.Load()),
-                attr=type_member, ctx=ast.Load()
+                value=ast.Attribute(value=ast.Name(id="mixpy_model", ctx=_LOAD), attr="TYPE", ctx=_LOAD),
+                attr=type_member, ctx=_LOAD
             )),
             ast.keyword(arg="target", value=ast.Constant(value=target)),
             ast.keyword(arg="method", value=ast.Constant(value=method)),
             ast.keyword(arg="at_name", value=ast.Constant(value=str(at_name))),
             ast.keyword(arg="trace_id", value=ast.Call(
-                func=ast.Name(id="str", ctx=ast.Load()),
-                args=[ast.Call(
-                    func=ast.Attribute(value=ast.Attribute(value=ast.Name(id="mixpy_runtime", ctx=ast.Load()), attr="time", ctx=ast.Load()), attr="time_ns", ctx=ast.Load()),
-                    args=[], keywords=[]
-                )],
-                keywords=[]
+                func=_rt_attr("_TRACE_COUNTER"),
+                args=[], keywords=[]
             )),
+            *(ast.keyword(arg=k, value=v) for k, v in fields.items()),
         ]
     )
 
 def _mk_dispatch_stmt(injectors_expr: ast.expr, ci_name: str, ctx_expr: ast.expr, cb_args: List[ast.expr], cb_keywords: Optional[List[ast.keyword]] = None, *, is_async: bool = False) -> ast.Expr:
     dispatch_attr = "async_dispatch_injectors" if is_async else "dispatch_injectors"
     call = ast.Call(
-        func=ast.Attribute(value=ast.Name(id="mixpy_runtime", ctx=ast.Load()), attr=dispatch_attr, ctx=ast.Load()),
-        args=[injectors_expr, ast.Name(id=ci_name, ctx=ast.Load()), ctx_expr, *cb_args],
+        func=_rt_attr(dispatch_attr),
+        args=[injectors_expr, ast.Name(id=ci_name, ctx=_LOAD), ctx_expr, *cb_args],
         keywords=cb_keywords or []
     )
     if is_async:
@@ -100,23 +170,23 @@ def _mk_dispatch_stmt(injectors_expr: ast.expr, ci_name: str, ctx_expr: ast.expr
 
 def _mk_if_cancel_return(ci_name: str) -> ast.If:
     return ast.If(
-        test=ast.Attribute(value=ast.Name(id=ci_name, ctx=ast.Load()), attr="is_cancelled", ctx=ast.Load()),
-        body=[ast.Return(value=ast.Attribute(value=ast.Name(id=ci_name, ctx=ast.Load()), attr="result", ctx=ast.Load()))],
+        test=ast.Attribute(value=ast.Name(id=ci_name, ctx=_LOAD), attr="_cancelled", ctx=_LOAD),
+        body=[ast.Return(value=ast.Attribute(value=ast.Name(id=ci_name, ctx=_LOAD), attr="_result", ctx=_LOAD))],
         orelse=[]
     )
 
 def _mk_if_value_set_assign(ci_name: str, var_name: str) -> ast.If:
     return ast.If(
-        test=ast.Attribute(value=ast.Name(id=ci_name, ctx=ast.Load()), attr="value_set", ctx=ast.Load()),
-        body=[ast.Assign(targets=[ast.Name(id=var_name, ctx=ast.Store())],
-                         value=ast.Attribute(value=ast.Name(id=ci_name, ctx=ast.Load()), attr="new_value", ctx=ast.Load()))],
+        test=ast.Attribute(value=ast.Name(id=ci_name, ctx=_LOAD), attr="_value_set", ctx=_LOAD),
+        body=[ast.Assign(targets=[ast.Name(id=var_name, ctx=_STORE)],
+                         value=ast.Attribute(value=ast.Name(id=ci_name, ctx=_LOAD), attr="_new_value", ctx=_LOAD))],
         orelse=[]
     )
 
 def _mk_if_value_set_return(ci_name: str) -> ast.If:
     return ast.If(
-        test=ast.Attribute(value=ast.Name(id=ci_name, ctx=ast.Load()), attr="value_set", ctx=ast.Load()),
-        body=[ast.Return(value=ast.Attribute(value=ast.Name(id=ci_name, ctx=ast.Load()), attr="new_value", ctx=ast.Load()))],
+        test=ast.Attribute(value=ast.Name(id=ci_name, ctx=_LOAD), attr="_value_set", ctx=_LOAD),
+        body=[ast.Return(value=ast.Attribute(value=ast.Name(id=ci_name, ctx=_LOAD), attr="_new_value", ctx=_LOAD))],
         orelse=[]
     )
 
@@ -132,34 +202,25 @@ class HeadHandler:
         is_async = isinstance(fn, ast.AsyncFunctionDef)
         method = fn.name
         at_name = "HEAD"
-        inj_var = "_mixin_inj_head"
         ci_name = "_mixin_ci_head"
-        # Fast-path: assign injector list once, skip dispatch when empty
-        inj_assign = ast.Assign(
-            targets=[ast.Name(id=inj_var, ctx=ast.Store())],
-            value=_get_injectors_call(target, method, "HEAD", at_name=at_name),
-        )
-        ci_assign = ast.Assign(targets=[ast.Name(id=ci_name, ctx=ast.Store())], value=_mk_ci_ctor("HEAD", target, method, at_name))
-
-        ctx = ast.Dict(
-            keys=[ast.Constant("self"), ast.Constant("args"), ast.Constant("kwargs"), ast.Constant("locals")],
-            values=[
-                _self_expr(fn),
-                _build_args_list_expr(fn),
-                _build_kwargs_dict_expr(fn),
-                ast.Call(func=ast.Name(id="locals", ctx=ast.Load()), args=[], keywords=[]),
-            ]
-        )
+        # Fast-path: injector list is a module-level binding, skip dispatch when empty
+        inj_expr = _site_ref(fn, target, method, "HEAD", at_name)
+        ci_assign = ast.Assign(targets=[ast.Name(id=ci_name, ctx=_STORE)], value=_mk_ci_ctor("HEAD", target, method, at_name))
+
+        ctx: ast.expr = ast.Constant(value=None)
+        if _needs_ctx(injectors):
+            ctx = _mk_frame_ctx(_frame_ctx_base(fn, _self_expr(fn), injectors))
         cb_args, cb_keywords = _dispatch_call_args_for_fn(fn)
-        dispatch = _mk_dispatch_stmt(ast.Name(id=inj_var, ctx=ast.Load()), ci_name, ctx, cb_args, cb_keywords, is_async=is_async)
+        dispatch = _mk_dispatch_stmt(inj_expr, ci_name, ctx, cb_args, cb_keywords, is_async=is_async)
         guard = _mk_if_cancel_return(ci_name)
+        action = _const_action(injectors, ("cancel",))
         fast_path_if = ast.If(
-            test=ast.Name(id=inj_var, ctx=ast.Load()),
-            body=[ci_assign, dispatch, guard],
+            test=inj_expr,
+            body=[ast.Return(value=ast.Constant(value=action[1]))] if action
+                 else _guarded([ci_assign, dispatch], guard, None, injectors),
             orelse=[],
         )
         fn.body.insert(0, fast_path_if)
-        fn.body.insert(0, inj_assign)
 
 class ParameterHandler:
     type = TYPE.PARAMETER
@@ -177,126 +238,94 @@ class ParameterHandler:
             return
         is_async = isinstance(fn, ast.AsyncFunctionDef)
         method = fn.name
+        base = _frame_ctx_base(fn, _self_expr(fn), injectors) if _needs_ctx(injectors) else None
+        # pass the full function signature to injector, like HEAD/TAIL
+        cb_args, cb_keywords = _dispatch_call_args_for_fn(fn)
+        action = _const_action(injectors, ("cancel", "set_value"))
 
-        for m in sorted(matches, key=lambda x: x.index or 0, reverse=True):
+        # one prologue block per matched parameter, in signature order
+        prepend: List[ast.stmt] = []
+        for m in sorted(matches, key=lambda x: x.index or 0):
             param_name = str(m.at.name)
-            inj_var = f"_mixin_inj_param_{param_name}"
             ci_name = f"_mixin_ci_param_{param_name}"
-            inj_assign = ast.Assign(
-                targets=[ast.Name(id=inj_var, ctx=ast.Store())],
-                value=_get_injectors_call(target, method, "PARAMETER", at_name=param_name),
-            )
-            ci_assign = ast.Assign(targets=[ast.Name(id=ci_name, ctx=ast.Store())], value=_mk_ci_ctor("PARAMETER", target, method, param_name))
-
-            ctx = ast.Dict(
-                keys=[ast.Constant("self"), ast.Constant("args"), ast.Constant("kwargs"), ast.Constant("locals"),
-                      ast.Constant("param"), ast.Constant("value")],
-                values=[
-                    _self_expr(fn),
-                    _build_args_list_expr(fn),
-                    _build_kwargs_dict_expr(fn),
-                    ast.Call(func=ast.Name(id="locals", ctx=ast.Load()), args=[], keywords=[]),
-                    ast.Constant(param_name),
-                    ast.Name(id=param_name, ctx=ast.Load()),
-                ]
-            )
-            # pass the full function signature to injector, like HEAD/TAIL
-            cb_args, cb_keywords = _dispatch_call_args_for_fn(fn)
-            dispatch = _mk_dispatch_stmt(ast.Name(id=inj_var, ctx=ast.Load()), ci_name, ctx, cb_args, cb_keywords, is_async=is_async)
+            inj_expr = _site_ref(fn, target, method, "PARAMETER", param_name)
+            ci_assign = ast.Assign(targets=[ast.Name(id=ci_name, ctx=_STORE)], value=_mk_ci_ctor("PARAMETER", target, method, param_name))
+
+            ctx: ast.expr = ast.Constant(value=None)
+            if base is not None:
+                ctx = _mk_frame_ctx(base, param=ast.Constant(param_name), value=ast.Name(id=param_name, ctx=_LOAD))
+            dispatch = _mk_dispatch_stmt(inj_expr, ci_name, ctx, cb_args, cb_keywords, is_async=is_async)
             guard = _mk_if_cancel_return(ci_name)
             maybe_set = _mk_if_value_set_assign(ci_name, param_name)
 
-            fast_path_if = ast.If(
-                test=ast.Name(id=inj_var, ctx=ast.Load()),
-                body=[ci_assign, dispatch, guard, maybe_set],
-                orelse=[],
-            )
-            fn.body.insert(0, fast_path_if)
-            fn.body.insert(0, inj_assign)
+            body = _guarded([ci_assign, dispatch], guard, maybe_set, injectors)
+            if action and action[0] == "cancel":
+                body = [ast.Return(value=ast.Constant(value=action[1]))]
+            elif action:
+                body = [ast.Assign(targets=[ast.Name(id=param_name, ctx=_STORE)], value=ast.Constant(value=action[1]))]
+            prepend.append(ast.If(test=inj_expr, body=body, orelse=[]))
+        fn.body[:0] = prepend
 
 class TailHandler:
     type = TYPE.TAIL
 
     def find(self, fn: ast.FunctionDef, at: At) -> List[Match]:
-        out: List[Match] = []
-        class Finder(ast.NodeVisitor):
-            def __init__(self): self.parents=[]
-            def generic_visit(self, node):
-                self.parents.append(node)
-                super().generic_visit(node)
-                self.parents.pop()
-            def visit_Return(self, node: ast.Return):
-                parent = self.parents[-1] if self.parents else None
-                out.append(Match(node=node, parent=parent, field=None, index=None, at=at))
-        Finder().visit(fn)
-        return out
+        idx = node_index(fn)
+        return [Match(node=n, parent=idx.parent(n), field=None, index=None, at=at) for n in idx.of_type(ast.Return)]
 
     def instrument(self, fn: ast.FunctionDef, matches: List[Match], injectors: List[InjectorSpec], target: str) -> None:
         is_async = isinstance(fn, ast.AsyncFunctionDef)
         method = fn.name
         at_name = "TAIL"
-        inj_var = "_mixin_inj_tail"
-        inj_assign = ast.Assign(
-            targets=[ast.Name(id=inj_var, ctx=ast.Store())],
-            value=_get_injectors_call(target, method, "TAIL", at_name=at_name),
-        )
-        inj_expr = ast.Name(id=inj_var, ctx=ast.Load())
+        inj_expr = _site_ref(fn, target, method, "TAIL", at_name)
         self_expr = _self_expr(fn)
+        base = _frame_ctx_base(fn, self_expr, injectors) if _needs_ctx(injectors) else None
+        cb_args, cb_keywords = _dispatch_call_args_for_fn(fn)
+        # cancel and set_value both end up as the returned value at TAIL
+        action = _const_action(injectors, ("cancel", "set_value"))
+
+        def rewrite(node: ast.Return) -> ast.stmt:
+            rv = node.value if node.value is not None else ast.Constant(value=None)
+            # Evaluate the returned expression once; ci, ctx and the final
+            # return all read the same value.
+            pre: List[ast.stmt] = []
+            if not isinstance(rv, (ast.Constant, ast.Name)):
+                pre.append(ast.Assign(targets=[ast.Name(id="_mixin_tail_rv", ctx=_STORE)], value=rv))
+                rv = ast.Name(id="_mixin_tail_rv", ctx=_LOAD)
+                node = ast.Return(value=rv)
+            ci_name = "_mixin_ci_tail"
+            ci_assign = ast.Assign(targets=[ast.Name(id=ci_name, ctx=_STORE)],
+                                   value=_mk_ci_ctor("TAIL", target, method, at_name, return_value=rv))
+
+            ctx: ast.expr = ast.Constant(value=None)
+            if base is not None:
+                ctx = _mk_frame_ctx(base, return_value=rv, value=rv)
+            dispatch = _mk_dispatch_stmt(inj_expr, ci_name, ctx, cb_args, cb_keywords, is_async=is_async)
+            guard = _mk_if_cancel_return(ci_name)
+            value_set_guard = _mk_if_value_set_return(ci_name)
+            fast_path_if = ast.If(
+                test=inj_expr,
+                body=[ast.Return(value=ast.Constant(value=action[1]))] if action
+                     else _guarded([ci_assign, dispatch], guard, value_set_guard, injectors),
+                orelse=[],
+            )
+            return ast.If(test=ast.Constant(value=True), body=[*pre, fast_path_if, node], orelse=[])
 
-        class RewriteReturns(ast.NodeTransformer):
-            def visit_Return(self, node: ast.Return):
-                rv = node.value if node.value is not None else ast.Constant(value=None)
-                ci_name = "_mixin_ci_tail"
-                ci_assign = ast.Assign(targets=[ast.Name(id=ci_name, ctx=ast.Store())], value=_mk_ci_ctor("TAIL", target, method, at_name))
-
-                ctx = ast.Dict(
-                    keys=[ast.Constant("self"), ast.Constant("args"), ast.Constant("kwargs"), ast.Constant("locals"),
-                          ast.Constant("return_value"), ast.Constant("value")],
-                    values=[
-                        self_expr,
-                        _build_args_list_expr(fn),
-                        _build_kwargs_dict_expr(fn),
-                        ast.Call(func=ast.Name(id="locals", ctx=ast.Load()), args=[], keywords=[]),
-                        rv,
-                        rv,
-                    ]
-                )
-                cb_args, cb_keywords = _dispatch_call_args_for_fn(fn)
-                dispatch = _mk_dispatch_stmt(inj_expr, ci_name, ctx, cb_args, cb_keywords, is_async=is_async)
-                guard = _mk_if_cancel_return(ci_name)
-                value_set_guard = _mk_if_value_set_return(ci_name)
-                fast_path_if = ast.If(
-                    test=inj_expr,
-                    body=[ci_assign, dispatch, guard, value_set_guard],
-                    orelse=[],
-                )
-                return ast.If(test=ast.Constant(value=True), body=[fast_path_if, node], orelse=[])
-
-        fn.body = [RewriteReturns().visit(s) for s in fn.body]
-        fn.body.insert(0, inj_assign)
+        _rewrite_matches(fn, matches, rewrite)
 
         # implicit tail at end
         ci_name = "_mixin_ci_tail_end"
-        ci_assign = ast.Assign(targets=[ast.Name(id=ci_name, ctx=ast.Store())], value=_mk_ci_ctor("TAIL", target, method, at_name))
-        ctx = ast.Dict(
-            keys=[ast.Constant("self"), ast.Constant("args"), ast.Constant("kwargs"), ast.Constant("locals"),
-                  ast.Constant("return_value"), ast.Constant("value")],
-            values=[
-                self_expr,
-                _build_args_list_expr(fn),
-                _build_kwargs_dict_expr(fn),
-                ast.Call(func=ast.Name(id="locals", ctx=ast.Load()), args=[], keywords=[]),
-                ast.Constant(value=None),
-                ast.Constant(value=None),
-            ]
-        )
-        cb_args, cb_keywords = _dispatch_call_args_for_fn(fn)
+        ci_assign = ast.Assign(targets=[ast.Name(id=ci_name, ctx=_STORE)], value=_mk_ci_ctor("TAIL", target, method, at_name))
+        ctx: ast.expr = ast.Constant(value=None)
+        if base is not None:
+            ctx = _mk_frame_ctx(base, return_value=ast.Constant(value=None), value=ast.Constant(value=None))
         dispatch = _mk_dispatch_stmt(inj_expr, ci_name, ctx, cb_args, cb_keywords, is_async=is_async)
         guard = _mk_if_cancel_return(ci_name)
         value_set_guard = _mk_if_value_set_return(ci_name)
         fast_path_end = ast.If(
             test=inj_expr,
-            body=[ci_assign, dispatch, guard, value_set_guard],
+            body=[ast.Return(value=ast.Constant(value=action[1]))] if action
+                 else _guarded([ci_assign, dispatch], guard, value_set_guard, injectors),
             orelse=[],
         )
         fn.body.append(fast_path_end)
@@ -305,19 +334,9 @@ class ConstHandler:
     type = TYPE.CONST
 
     def find(self, fn: ast.FunctionDef, at: At) -> List[Match]:
-        matches: List[Match] = []
-        class Finder(ast.NodeVisitor):
-            def __init__(self): self.parents=[]
-            def generic_visit(self, node):
-                self.parents.append(node)
-                super().generic_visit(node)
-                self.parents.pop()
-            def visit_Constant(self, node: ast.Constant):
-                if node.value == at.name:
-                    parent = self.parents[-1] if self.parents else None
-                    matches.append(Match(node=node, parent=parent, field=None, index=None, at=at))
-        Finder().visit(fn)
-        return matches
+        idx = node_index(fn)
+        return [Match(node=n, parent=idx.parent(n), field=None, index=None, at=at)
+                for n in idx.of_type(ast.Constant) if n.value == at.name]
 
     def instrument(self, fn: ast.FunctionDef, matches: List[Match], injectors: List[InjectorSpec], target: str) -> None:
         if not matches:
@@ -325,26 +344,36 @@ class ConstHandler:
         at_name = injectors[0].at.name
         method = fn.name
         self_expr = _self_expr(fn)
-        match_nodes = {m.node for m in matches}
-
-        class Rewriter(ast.NodeTransformer):
-            def visit_Constant(self, node: ast.Constant):
-                if node in match_nodes:
-                    return ast.Call(
-                        func=ast.Attribute(value=ast.Name(id="mixpy_runtime", ctx=ast.Load()), attr="eval_const", ctx=ast.Load()),
-                        args=[
-                            ast.Name(id="__mixin_injectors__", ctx=ast.Load()),
-                            ast.Constant(value=target),
-                            ast.Constant(value=method),
-                            ast.Constant(value=str(at_name)),
-                            self_expr,
-                            ast.Constant(value=node.value),
-                        ],
-                        keywords=[]
-                    )
-                return node
-
-        fn.body = [Rewriter().visit(s) for s in fn.body]
+        action = _const_action(injectors, ("cancel", "set_value"))
+
+        def rewrite(node: ast.Constant) -> ast.expr:
+            if action:
+                return ast.IfExp(test=_site_ref(fn, target, method, "CONST", at_name),
+                                 body=ast.Constant(value=action[1]), orelse=ast.Constant(value=node.value))
+            return ast.Call(
+                func=ast.Name(id="__mixin_eval_const__", ctx=_LOAD),
+                args=[
+                    _site_ref(fn, target, method, "CONST", at_name),
+                    ast.Constant(value=target),
+                    ast.Constant(value=method),
+                    ast.Constant(value=str(at_name)),
+                    self_expr,
+                    ast.Constant(value=node.value),
+                ],
+                keywords=[]
+            )
+
+        _rewrite_matches(fn, matches, rewrite)
+
+def _resolve_starstar(kw_value: ast.AST) -> Tuple[Dict[str, ast.AST], bool]:
+    # If **{ "k": expr } literal, we can resolve keys; otherwise unknown.
+    # Keys are all checked before the mapping is built.
+    if not isinstance(kw_value, ast.Dict):
+        return {}, True
+    keys = kw_value.keys
+    if not all(isinstance(k, ast.Constant) and isinstance(k.value, str) for k in keys):
+        return {}, True
+    return {k.value: v for k, v in zip(keys, kw_value.values)}, False
 
 class InvokeHandler:
     type = TYPE.INVOKE
@@ -366,48 +395,29 @@ class InvokeHandler:
                     return tuple(reversed(parts))
             return None
 
-        def resolve_starstar(kw_value: ast.AST) -> Tuple[Dict[str, ast.AST], bool]:
-            # If **{ "k": expr } literal, we can resolve keys; otherwise unknown.
-            if isinstance(kw_value, ast.Dict):
-                out: Dict[str, ast.AST] = {}
-                for k, v in zip(kw_value.keys, kw_value.values):
-                    if not isinstance(k, ast.Constant) or not isinstance(k.value, str):
-                        return {}, True
-                    out[k.value] = v
-                return out, False
-            return {}, True
-
-        class Finder(ast.NodeVisitor):
-            def __init__(self): self.parents=[]
-            def generic_visit(self, node):
-                self.parents.append(node)
-                super().generic_visit(node)
-                self.parents.pop()
-            def visit_Call(self, node: ast.Call):
-                parts = call_parts(node.func)
-                dotted = ".".join(parts) if parts else None
-
-                ok = False
-                if isinstance(at.selector, CallSelector):
-                    kw: Dict[str, ast.AST] = {}
-                    has_unknown = False
-                    for k in node.keywords:
-                        if k.arg is None:
-                            extra, unk = resolve_starstar(k.value)
-                            kw.update(extra)
-                            has_unknown = has_unknown or unk
-                        else:
-                            kw[k.arg] = k.value
-                    ok = at.selector.match(parts, node.args, kw, has_unresolved_starstar=has_unknown)
-                else:
-                    ok = (dotted == str(at.name))
-
-                if ok:
-                    parent = self.parents[-1] if self.parents else None
-                    matches.append(Match(node=node, parent=parent, field=None, index=None, at=at))
-                self.generic_visit(node)
-
-        Finder().visit(fn)
+        matcher = at.selector.compile_match() if isinstance(at.selector, CallSelector) else None
+        idx = node_index(fn)
+        for node in idx.of_type(ast.Call):
+            parts = call_parts(node.func)
+            dotted = ".".join(parts) if parts else None
+
+            ok = False
+            if matcher is not None:
+                kw: Dict[str, ast.AST] = {}
+                has_unknown = False
+                for k in node.keywords:
+                    if k.arg is None:
+                        extra, unk = _resolve_starstar(k.value)
+                        kw.update(extra)
+                        has_unknown = has_unknown or unk
+                    else:
+                        kw[k.arg] = k.value
+                ok = matcher(parts, node.args, kw, has_unknown)
+            else:
+                ok = (dotted == str(at.name))
+
+            if ok:
+                matches.append(Match(node=node, parent=idx.parent(node), field=None, index=None, at=at))
         return matches
 
     def instrument(self, fn: ast.FunctionDef, matches: List[Match], injectors: List[InjectorSpec], target: str) -> None:
@@ -416,100 +426,87 @@ class InvokeHandler:
         at_name = injectors[0].at.name
         method = fn.name
         self_expr = _self_expr(fn)
-        match_nodes = {m.node for m in matches}
-
-        class Rewriter(ast.NodeTransformer):
-            def visit_Call(self, node: ast.Call):
-                node = self.generic_visit(node)
-                if node in match_nodes:
-                    call_original = ast.Lambda(
-                        args=ast.arguments(
-                            posonlyargs=[],
-                            args=[],
-                            vararg=ast.arg(arg="_mixin_args"),
-                            kwonlyargs=[],
-                            kw_defaults=[],
-                            kwarg=ast.arg(arg="_mixin_kwargs"),
-                            defaults=[],
-                        ),
-                        body=ast.Call(
-                            func=node.func,
-                            args=[
-                                ast.Starred(value=ast.Name(id="_mixin_args", ctx=ast.Load()), ctx=ast.Load())
-                            ],
-                            keywords=[ast.keyword(arg=None, value=ast.Name(id="_mixin_kwargs", ctx=ast.Load()))],
-                        ),
-                    )
-
-                    args_list = ast.List(elts=list(node.args), ctx=ast.Load())
-
-                    # Build merged kwargs dict to preserve **kwargs keys for runtime dispatch/conditions.
-                    explicit = ast.Dict(
-                        keys=[ast.Constant(value=k.arg) for k in node.keywords if k.arg is not None],
-                        values=[k.value for k in node.keywords if k.arg is not None]
-                    )
-                    starstars = [k.value for k in node.keywords if k.arg is None]
-                    if starstars:
-                        kwargs_expr = ast.Call(
-                            func=ast.Attribute(value=ast.Name(id="mixpy_runtime", ctx=ast.Load()), attr="merge_kwargs", ctx=ast.Load()),
-                            args=[explicit, *starstars],
-                            keywords=[]
-                        )
-                    else:
-                        kwargs_expr = explicit
-
-                    return ast.Call(
-                        func=ast.Attribute(value=ast.Name(id="mixpy_runtime", ctx=ast.Load()), attr="eval_invoke", ctx=ast.Load()),
-                        args=[
-                            ast.Name(id="__mixin_injectors__", ctx=ast.Load()),
-                            ast.Constant(value=target),
-                            ast.Constant(value=method),
-                            ast.Constant(value=str(at_name)),
-                            self_expr,
-                            call_original,
-                            args_list,
-                            kwargs_expr,
-                        ],
-                        keywords=[]
-                    )
-                return node
-
-        fn.body = [Rewriter().visit(s) for s in fn.body]
+        guarded = site_guarded(injectors)
+
+        def rewrite(node: ast.Call) -> ast.expr:
+            # inner matched calls are already rewritten when their outer call is
+            call_original = ast.Lambda(
+                args=ast.arguments(
+                    posonlyargs=[],
+                    args=[],
+                    vararg=ast.arg(arg="_mixin_args"),
+                    kwonlyargs=[],
+                    kw_defaults=[],
+                    kwarg=ast.arg(arg="_mixin_kwargs"),
+                    defaults=[],
+                ),
+                body=ast.Call(
+                    func=node.func,
+                    args=[
+                        ast.Starred(value=ast.Name(id="_mixin_args", ctx=_LOAD), ctx=_LOAD)
+                    ],
+                    keywords=[ast.keyword(arg=None, value=ast.Name(id="_mixin_kwargs", ctx=_LOAD))],
+                ),
+            )
+
+            args_list = ast.List(elts=list(node.args), ctx=_LOAD)
+
+            # Build merged kwargs dict to preserve **kwargs keys for runtime dispatch/conditions.
+            explicit = ast.Dict(
+                keys=[ast.Constant(value=k.arg) for k in node.keywords if k.arg is not None],
+                values=[k.value for k in node.keywords if k.arg is not None]
+            )
+            starstars = [k.value for k in node.keywords if k.arg is None]
+            if starstars:
+                kwargs_expr = ast.Call(
+                    func=_rt_attr("merge_kwargs"),
+                    args=[explicit, *starstars],
+                    keywords=[]
+                )
+            else:
+                kwargs_expr = explicit
+
+            dispatch = ast.Call(
+                func=ast.Name(id="__mixin_eval_invoke__", ctx=_LOAD),
+                args=[
+                    _site_ref(fn, target, method, "INVOKE", at_name),
+                    ast.Constant(value=target),
+                    ast.Constant(value=method),
+                    ast.Constant(value=str(at_name)),
+                    self_expr,
+                    call_original,
+                    args_list,
+                    kwargs_expr,
+                ],
+                keywords=[]
+            )
+            if not guarded:
+                return dispatch
+            # (<original call> if guard(self) else <dispatch>)
+            return ast.IfExp(
+                test=ast.Call(func=_guard_ref(fn, target, method, "INVOKE", at_name), args=[self_expr], keywords=[]),
+                body=copy.deepcopy(node),
+                orelse=dispatch,
+            )
+
+        _rewrite_matches(fn, matches, rewrite)
 
 class AttributeHandler:
     type = TYPE.ATTRIBUTE
 
     def find(self, fn: ast.FunctionDef, at: At) -> List[Match]:
         matches: List[Match] = []
-        target_name = str(at.name)
-
-        def attr_dotted(n: ast.AST) -> Optional[str]:
-            parts = _dotted_name_from_attribute(n)
-            return ".".join(parts) if parts else None
-
-        class Finder(ast.NodeVisitor):
-            def __init__(self): self.parents=[]
-            def generic_visit(self, node):
-                self.parents.append(node)
-                super().generic_visit(node)
-                self.parents.pop()
-            def visit_Assign(self, node: ast.Assign):
-                for idx, t in enumerate(node.targets):
-                    if isinstance(t, ast.Attribute) and attr_dotted(t) == target_name:
-                        matches.append(Match(node=node, parent=self.parents[-1] if self.parents else None, field="targets", index=idx, at=at))
-                self.generic_visit(node)
-            def visit_AnnAssign(self, node: ast.AnnAssign):
-                t = node.target
-                if isinstance(t, ast.Attribute) and attr_dotted(t) == target_name:
-                    matches.append(Match(node=node, parent=self.parents[-1] if self.parents else None, field="target", index=None, at=at))
-                self.generic_visit(node)
-            def visit_AugAssign(self, node: ast.AugAssign):
-                t = node.target
-                if isinstance(t, ast.Attribute) and attr_dotted(t) == target_name:
-                    matches.append(Match(node=node, parent=self.parents[-1] if self.parents else None, field="target", index=None, at=at))
-                self.generic_visit(node)
-
-        Finder().visit(fn)
+        target_parts = tuple(str(at.name).split("."))
+
+        idx = node_index(fn)
+        for node in idx.of_type(ast.Assign, ast.AnnAssign, ast.AugAssign):
+            parent = idx.parent(node)
+            if isinstance(node, ast.Assign):
+                for i, t in enumerate(node.targets):
+                    if isinstance(t, ast.Attribute) and _attr_path_is(t, target_parts):
+                        matches.append(Match(node=node, parent=parent, field="targets", index=i, at=at))
+            elif isinstance(node.target, ast.Attribute) and _attr_path_is(node.target, target_parts):
+                matches.append(Match(node=node, parent=parent, field="target", index=None, at=at))
         return matches
 
     def instrument(self, fn: ast.FunctionDef, matches: List[Match], injectors: List[InjectorSpec], target: str) -> None:
@@ -518,65 +515,31 @@ class AttributeHandler:
         at_name = injectors[0].at.name
         method = fn.name
         self_expr = _self_expr(fn)
-        match_nodes = {m.node for m in matches}
-
-        class Rewriter(ast.NodeTransformer):
-            def visit_Assign(self, node: ast.Assign):
-                node = self.generic_visit(node)
-                if node in match_nodes:
-                    new_value = ast.Call(
-                        func=ast.Attribute(value=ast.Name(id="mixpy_runtime", ctx=ast.Load()), attr="eval_attr_write", ctx=ast.Load()),
-                        args=[
-                            ast.Name(id="__mixin_injectors__", ctx=ast.Load()),
-                            ast.Constant(value=target),
-                            ast.Constant(value=method),
-                            ast.Constant(value=str(at_name)),
-                            self_expr,
-                            node.value,
-                        ],
-                        keywords=[]
-                    )
-                    return ast.Assign(targets=node.targets, value=new_value)
-                return node
-
-            def visit_AnnAssign(self, node: ast.AnnAssign):
-                node = self.generic_visit(node)
-                if node in match_nodes and node.value is not None:
-                    new_value = ast.Call(
-                        func=ast.Attribute(value=ast.Name(id="mixpy_runtime", ctx=ast.Load()), attr="eval_attr_write", ctx=ast.Load()),
-                        args=[
-                            ast.Name(id="__mixin_injectors__", ctx=ast.Load()),
-                            ast.Constant(value=target),
-                            ast.Constant(value=method),
-                            ast.Constant(value=str(at_name)),
-                            self_expr,
-                            node.value,
-                        ],
-                        keywords=[]
-                    )
-                    return ast.AnnAssign(target=node.target, annotation=node.annotation, value=new_value, simple=node.simple)
-                return node
-
-            def visit_AugAssign(self, node: ast.AugAssign):
-                node = self.generic_visit(node)
-                if node in match_nodes:
-                    binop = ast.BinOp(left=node.target, op=node.op, right=node.value)
-                    new_value = ast.Call(
-                        func=ast.Attribute(value=ast.Name(id="mixpy_runtime", ctx=ast.Load()), attr="eval_attr_write", ctx=ast.Load()),
-                        args=[
-                            ast.Name(id="__mixin_injectors__", ctx=ast.Load()),
-                            ast.Constant(value=target),
-                            ast.Constant(value=method),
-                            ast.Constant(value=str(at_name)),
-                            self_expr,
-                            binop,
-                        ],
-                        keywords=[]
-                    )
-                    return ast.Assign(targets=[node.target], value=new_value)
-                return node
-
-        fn.body = [Rewriter().visit(s) for s in fn.body]
+        def write_site(value: ast.expr) -> ast.Call:
+            return ast.Call(
+                func=ast.Name(id="__mixin_eval_attr_write__", ctx=_LOAD),
+                args=[
+                    _site_ref(fn, target, method, "ATTRIBUTE", at_name),
+                    ast.Constant(value=target),
+                    ast.Constant(value=method),
+                    ast.Constant(value=str(at_name)),
+                    self_expr,
+                    value,
+                ],
+                keywords=[]
+            )
+
+        def rewrite(node: ast.stmt) -> ast.stmt:
+            if isinstance(node, ast.Assign):
+                return ast.Assign(targets=node.targets, value=write_site(node.value))
+            if isinstance(node, ast.AnnAssign):
+                if node.value is None:
+                    return node
+                return ast.AnnAssign(target=node.target, annotation=node.annotation, value=write_site(node.value), simple=node.simple)
+            binop = ast.BinOp(left=node.target, op=node.op, right=node.value)
+            return ast.Assign(targets=[node.target], value=write_site(binop))
+
+        _rewrite_matches(fn, matches, rewrite)
 
 class ExceptionHandler:
     type = TYPE.EXCEPTION
@@ -592,32 +555,26 @@ class ExceptionHandler:
         method = fn.name
         at_name = "EXCEPTION"
         self_expr = _self_expr(fn)
-        inj = _get_injectors_call(target, method, "EXCEPTION", at_name)
+        inj = _site_ref(fn, target, method, "EXCEPTION", at_name)
         ci_name = "_mixin_ci_exc"
 
         # Build the except handler:
-        #   _mixin_ci_exc = CallbackInfo(...)
+        #   _mixin_ci_exc = CallbackInfo(..., exception=_mixin_exc)
         #   _mixin_ci_exc._ctx = {"exception": _mixin_exc, ...}
         #   dispatch_injectors(injectors, _mixin_ci_exc, ctx, self)
         #   if _mixin_ci_exc.is_cancelled: return _mixin_ci_exc.result
         #   raise
         exc_var = "_mixin_exc"
+        action = _const_action(injectors, ("cancel",))
         ci_assign = ast.Assign(
-            targets=[ast.Name(id=ci_name, ctx=ast.Store())],
-            value=_mk_ci_ctor("EXCEPTION", target, method, at_name),
+            targets=[ast.Name(id=ci_name, ctx=_STORE)],
+            value=_mk_ci_ctor("EXCEPTION", target, method, at_name, exception=ast.Name(id=exc_var, ctx=_LOAD)),
         )
-        ctx = ast.Dict(
-            keys=[ast.Constant("self"), ast.Constant("args"), ast.Constant("kwargs"),
-                  ast.Constant("locals"), ast.Constant("exception")],
-            values=[
-                self_expr,
-                _build_args_list_expr(fn),
-                _build_kwargs_dict_expr(fn),
-                ast.Call(func=ast.Name(id="locals", ctx=ast.Load()), args=[], keywords=[]),
-                ast.Name(id=exc_var, ctx=ast.Load()),
-            ],
-        )
-        # EXCEPTION callbacks receive only self (like CONST); exception is in ci.get_context()["exception"]
+        ctx: ast.expr = ast.Constant(value=None)
+        if _needs_ctx(injectors):
+            ctx = _mk_frame_ctx(_frame_ctx_base(fn, self_expr, injectors), exception=ast.Name(id=exc_var, ctx=_LOAD))
+        # EXCEPTION callbacks receive only self (like CONST); the exception is ci.exception
+        # (and ci.get_context()["exception"])
         cb_args = [self_expr]
         dispatch = _mk_dispatch_stmt(inj, ci_name, ctx, cb_args, is_async=is_async)
         guard = _mk_if_cancel_return(ci_name)
@@ -626,7 +583,8 @@ class ExceptionHandler:
         except_handler = ast.ExceptHandler(
             type=None,  # catches BaseException
             name=exc_var,
-            body=[ci_assign, dispatch, guard, reraise],
+            body=[ast.Return(value=ast.Constant(value=action[1]))] if action
+                 else _guarded([ci_assign, dispatch], guard, None, injectors) + [reraise],
         )
         try_node = ast.Try(
             body=list(fn.body),
@@ -648,22 +606,15 @@ class YieldHandler:
     type = TYPE.YIELD
 
     def find(self, fn: ast.FunctionDef, at: At) -> List[Match]:
+        idx = node_index(fn)
         matches: List[Match] = []
-
-        class Finder(ast.NodeVisitor):
-            def __init__(self):
-                self.parents: List[ast.AST] = []
-
-            def generic_visit(self, node: ast.AST) -> None:
-                self.parents.append(node)
-                super().generic_visit(node)
-                self.parents.pop()
-
-            def visit_Yield(self, node: ast.Yield) -> None:  # type: ignore[override]
-                parent = self.parents[-1] if self.parents else None
-                matches.append(Match(node=node, parent=parent, field=None, index=None, at=at))
-
-        Finder().visit(fn)
+        for node in idx.of_type(ast.Yield):
+            # a yield nested in another yield's value is rewritten with its outer one
+            up = idx.parent(node)
+            while up is not None and not isinstance(up, ast.Yield):
+                up = idx.parent(up)
+            if up is None:
+                matches.append(Match(node=node, parent=idx.parent(node), field=None, index=None, at=at))
         return matches
 
     def instrument(self, fn: ast.FunctionDef, matches: List[Match], injectors: List[InjectorSpec], target: str) -> None:
@@ -672,40 +623,36 @@ class YieldHandler:
         at_name = "YIELD"
         method = fn.name
         self_expr = _self_expr(fn)
-        match_nodes = {m.node for m in matches}
-
-        class Rewriter(ast.NodeTransformer):
-            def visit_Yield(self, node: ast.Yield) -> ast.AST:  # type: ignore[override]
-                if node not in match_nodes:
-                    return node
-                yield_value = node.value if node.value is not None else ast.Constant(value=None)
-                new_value = ast.Call(
-                    func=ast.Attribute(
-                        value=ast.Name(id="mixpy_runtime", ctx=ast.Load()),
-                        attr="eval_yield",
-                        ctx=ast.Load(),
-                    ),
-                    args=[
-                        ast.Name(id="__mixin_injectors__", ctx=ast.Load()),
-                        ast.Constant(value=target),
-                        ast.Constant(value=method),
-                        ast.Constant(value=at_name),
-                        self_expr,
-                        yield_value,
-                    ],
-                    keywords=[],
-                )
-                return ast.Yield(value=new_value)
+        # Matches are the Yield nodes themselves and stay in place; only their
+        # values are wrapped, so no parent slot has to be swapped.
+        for m in matches:
+            node = m.node
+            yield_value = node.value if node.value is not None else ast.Constant(value=None)
+            node.value = ast.Call(
+                func=ast.Name(id="__mixin_eval_yield__", ctx=_LOAD),
+                args=[
+                    _site_ref(fn, target, method, "YIELD", at_name),
+                    ast.Constant(value=target),
+                    ast.Constant(value=method),
+                    ast.Constant(value=at_name),
+                    self_expr,
+                    yield_value,
+                ],
+                keywords=[],
+            )
 
-        fn.body = [Rewriter().visit(s) for s in fn.body]
 
+# Handlers are stateless, so one instance of each serves every install.
+_BUILTIN_HANDLERS = (
+    HeadHandler(),
+    ParameterHandler(),
+    TailHandler(),
+    ConstHandler(),
+    InvokeHandler(),
+    AttributeHandler(),
+    ExceptionHandler(),
+    YieldHandler(),
+)
 
 def install_builtin_handlers():
-    register_handler(HeadHandler())
-    register_handler(ParameterHandler())
-    register_handler(TailHandler())
-    register_handler(ConstHandler())
-    register_handler(InvokeHandler())
-    register_handler(AttributeHandler())
-    register_handler(ExceptionHandler())
-    register_handler(YieldHandler())
+    register_handlers(_BUILTIN_HANDLERS)
@@ -1,11 +1,15 @@
 from __future__ import annotations
 import os
 import ast
+import atexit
 import pathlib
 import sys
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List
 
-_dump_dir: str | None = None
+_dump_dir: pathlib.Path | None = None
 
 # ---------------------------------------------------------------------------
 # ANSI colour helpers
@@ -28,7 +32,7 @@ def _colour_enabled() -> bool:
 
 
 def _c(text: str, *codes: str) -> str:
-    if not _colour_enabled():
+    if not _COLOUR_ENABLED:
         return text
     return "".join(codes) + text + _RESET
 
@@ -51,9 +55,25 @@ def _current_level() -> int:
     return _LEVELS.get(raw, _LEVELS["WARN"])
 
 
+# FORCE_COLOR / the stderr tty check and MIXPY_LOG_LEVEL are read once rather
+# than on every log line; call reconfigure_logging() after changing them.
+_COLOUR_ENABLED = False
+_CURRENT_LEVEL = _LEVELS["WARN"]
+
+
+def reconfigure_logging() -> None:
+    """Re-read the colour and log-level settings ``log`` uses."""
+    global _COLOUR_ENABLED, _CURRENT_LEVEL
+    _COLOUR_ENABLED = _colour_enabled()
+    _CURRENT_LEVEL = _current_level()
+
+
+reconfigure_logging()
+
+
 def log(level: str, message: str, *, stream=None) -> None:
     """Emit a structured log line to *stream* (default: ``sys.stderr``)."""
-    if _LEVELS.get(level.upper(), 0) < _current_level():
+    if _LEVELS.get(level.upper(), 0) < _CURRENT_LEVEL:
         return
     if stream is None:
         stream = sys.stderr
@@ -63,8 +83,10 @@ def log(level: str, message: str, *, stream=None) -> None:
     print(f"{prefix} {_c(ts, _DIM)} {message}", file=stream)
 
 
-def log_trace(target: str, method: str, type_val: str, at_name: str, cb_qualname: str, trace_id: str) -> None:
+def log_trace(target: str, method: str, type_val: str, at_name: str, cb_qualname: str, trace_id: object) -> None:
     """Emit a TRACE-level injector invocation line."""
+    if _CURRENT_LEVEL > _LEVELS["DEBUG"]:
+        return  # skip formatting a line log() would drop
     msg = (
         f"{_c(target, _CYAN)}.{_c(method, _BOLD)}"
         f" [{_c(type_val, _MAGENTA)}:{_c(str(at_name), _YELLOW)}]"
@@ -76,6 +98,8 @@ def log_trace(target: str, method: str, type_val: str, at_name: str, cb_qualname
 
 def log_cancel(result: object) -> None:
     """Emit a TRACE-level cancellation line."""
+    if _CURRENT_LEVEL > _LEVELS["DEBUG"]:
+        return
     log("DEBUG", f"  {_c('↳ cancelled', _YELLOW)} result={result!r}")
 
 
@@ -86,20 +110,24 @@ def log_cancel(result: object) -> None:
 def set_dump_dir(directory: str | None) -> None:
     """Set (or clear) the directory used by :func:`maybe_dump`."""
     global _dump_dir
-    _dump_dir = directory
+    # resolved once here rather than on every woven import
+    _dump_dir = pathlib.Path(directory).absolute() if directory else None
+
+
+# Dumps are unparsed and written on one worker thread so a debug import does
+# not wait on ast.unparse; flush_dumps() blocks until they are on disk.
+_dump_pool: ThreadPoolExecutor | None = None
+_pending_dumps: List[Future] = []
 
 
 def maybe_dump(module_name: str, tree: ast.AST) -> None:
+    global _dump_pool
     if os.getenv("MIXIN_DEBUG") != "True":
         return
-    out_path = _dump_dir or os.getenv("MIXIN_DUMP_DIR") or ".weaved"
-    out_dir = pathlib.Path(out_path)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    try:
-        src = ast.unparse(tree)
-    except Exception:
-        src = "<unparse failed>"
-
+    out_dir = _dump_dir or pathlib.Path(os.getenv("MIXIN_DUMP_DIR") or ".weaved").absolute()
+    if _dump_pool is None:
+        _dump_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mixpy-dump")
+        atexit.register(flush_dumps)
     ts = time.strftime("%Y-%m-%d %H:%M:%S")
     version = _get_version()
     header = (
@@ -109,12 +137,32 @@ def maybe_dump(module_name: str, tree: ast.AST) -> None:
         f"# Do not edit — this file is overwritten on each import.\n"
         f"{'#' * 72}\n\n"
     )
+    # The woven tree is only compiled after this point, never mutated, so the
+    # worker can read it without a copy.
+    _pending_dumps.append(_dump_pool.submit(_write_dump, module_name, tree, out_dir, header))
+
+
+def flush_dumps() -> None:
+    """Block until every pending :func:`maybe_dump` write has finished."""
+    while _pending_dumps:
+        _pending_dumps.pop(0).result()
+
+
+def _write_dump(module_name: str, tree: ast.AST, out_dir: pathlib.Path, header: str) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        src = ast.unparse(tree)
+    except Exception:
+        src = "<unparse failed>"
+
     out_file = out_dir / f"{module_name.replace('.', '_')}.py"
-    out_file.write_text(header + src, encoding="utf-8")
+    out_file.write_bytes((header + src).encode("utf-8"))
     log("INFO", f"AST dump written → {out_file}")
 
 
+@lru_cache(maxsize=None)
 def _get_version() -> str:
+    # metadata lookups scan sys.path; the installed version cannot change mid-run
     try:
         from importlib.metadata import version
         return version("mixpy")
@@ -1,12 +1,13 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, List, Optional, Protocol, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Set, Tuple, Type
 import ast
+import zlib
 
 from .model import At, TYPE, Loc
 from .registry import InjectorSpec
 
-@dataclass
+@dataclass(slots=True)
 class Match:
     node: ast.AST
     parent: Optional[ast.AST]
@@ -14,15 +15,176 @@ class Match:
     index: Optional[int]
     at: At
 
+# type -> fields that can hold child nodes, learned from the first instance
+# seen: a field holding a str/int/bool there is a scalar in every instance.
+_CHILD_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+def _child_fields(node: ast.AST) -> Tuple[str, ...]:
+    t = type(node)
+    fields = _CHILD_FIELDS.get(t)
+    if fields is None:
+        fields = _CHILD_FIELDS[t] = tuple(
+            f for f in t._fields if isinstance(getattr(node, f, None), (ast.AST, list, type(None)))
+        )
+    return fields
+
+class NodeIndex:
+    """Parent links and pre-order node lists for one function, from a single walk.
+
+    Every handler's ``find`` (and location anchors) reads the same index, so a
+    function is walked once per rewrite instead of once per injection point.
+    ``slots`` records where each node sits so handlers can swap it in place.
+    """
+    __slots__ = ("parents", "order", "by_type", "slots", "positions", "memo")
+
+    def __init__(self, fn: ast.AST):
+        self.parents: Dict[int, ast.AST] = {}
+        self.order: List[ast.AST] = []
+        self.by_type: Dict[type, List[ast.AST]] = {}
+        # id(node) -> [(parent, field, list index or None, inside fn.body)]
+        self.slots: Dict[int, List[Tuple[ast.AST, str, Optional[int], bool]]] = {}
+        self.positions: Dict[int, int] = {}
+        # other per-function tables derived from this walk; dropped with it
+        self.memo: Dict[str, Any] = {}
+        # same order as ast.NodeVisitor: pre-order, children in _fields order
+        stack: List[Tuple[ast.AST, bool]] = [(fn, False)]
+        while stack:
+            node, in_body = stack.pop()
+            self.positions.setdefault(id(node), len(self.order))
+            self.order.append(node)
+            self.by_type.setdefault(type(node), []).append(node)
+            children: List[Tuple[ast.AST, bool]] = []
+            for field in _child_fields(node):
+                value = getattr(node, field, None)
+                child_in_body = in_body or (node is fn and field == "body")
+                if isinstance(value, ast.AST):
+                    self._link(value, node, field, None, child_in_body)
+                    children.append((value, child_in_body))
+                elif isinstance(value, list):
+                    for i, item in enumerate(value):
+                        if isinstance(item, ast.AST):
+                            self._link(item, node, field, i, child_in_body)
+                            children.append((item, child_in_body))
+            stack.extend(reversed(children))
+
+    def _link(self, child: ast.AST, parent: ast.AST, field: str, index: Optional[int], in_body: bool) -> None:
+        self.parents[id(child)] = parent
+        self.slots.setdefault(id(child), []).append((parent, field, index, in_body))
+
+    def parent(self, node: ast.AST) -> Optional[ast.AST]:
+        return self.parents.get(id(node))
+
+    def position(self, node: ast.AST) -> int:
+        return self.positions[id(node)]
+
+    def of_type(self, *types: Type[ast.AST]) -> List[ast.AST]:
+        if len(types) == 1:
+            return self.by_type.get(types[0], [])
+        return [n for n in self.order if isinstance(n, types)]
+
+    def replace_in_body(self, nodes: List[ast.AST], rewrite: Callable[[ast.AST], ast.AST]) -> None:
+        """Swap each node for ``rewrite(node)`` wherever it sits inside the function body.
+
+        Deepest nodes go first, so an enclosing match is rewritten around its
+        already-rewritten children. Positions outside ``body`` (decorators,
+        defaults, annotations) are left alone.
+        """
+        unique = {id(n): n for n in nodes}
+        for node in sorted(unique.values(), key=self.position, reverse=True):
+            new = rewrite(node)
+            if new is node:
+                continue
+            for parent, field, index, in_body in self.slots.get(id(node), ()):
+                if not in_body:
+                    continue
+                if index is None:
+                    setattr(parent, field, new)
+                else:
+                    getattr(parent, field)[index] = new
+
+_INDEX_ATTR = "_mixin_node_index"
+
+def node_index(fn: ast.AST) -> NodeIndex:
+    """Return the cached :class:`NodeIndex` for ``fn``, building it on first use."""
+    idx = fn.__dict__.get(_INDEX_ATTR)
+    if idx is None:
+        idx = NodeIndex(fn)
+        setattr(fn, _INDEX_ATTR, idx)
+    return idx
+
+def invalidate_index(fn: ast.AST) -> None:
+    """Drop ``fn``'s cached index; call after rewriting the function."""
+    fn.__dict__.pop(_INDEX_ATTR, None)
+
 class TypeHandler(Protocol):
     type: TYPE
     def find(self, fn: ast.FunctionDef, at: At) -> List[Match]: ...
     def instrument(self, fn: ast.FunctionDef, matches: List[Match], injectors: List[InjectorSpec], target: str) -> None: ...
 
+SiteKey = Tuple[str, str, str, str]
+
+def site_key(target: str, method: str, at: At) -> SiteKey:
+    """Key under which injectors for ``at`` are published in ``__mixin_injectors__``."""
+    canon_name = at.name if at.name is not None else at.type.value
+    return (target, method, at.type.value, str(canon_name))
+
+def site_var(key: SiteKey, prefix: str = "_mixin_inj") -> str:
+    """Module-level name bound once at import to the injector list for ``key``."""
+    crc = zlib.crc32(repr(key).encode("utf-8"))
+    return f"{prefix}_{key[1]}_{key[2].lower()}_{crc:08x}"
+
+GUARD_PREFIX = "_mixin_guard"
+
+class SiteNames:
+    """One module's site variable names.
+
+    ``site_var`` names are short hashes, so two keys can collide; a colliding
+    key gets a numbered suffix instead of silently sharing the other's binding.
+    Names are handed out in weaving order, which is fixed for a given source
+    and registry, so woven output stays deterministic.
+    """
+
+    def __init__(self) -> None:
+        self._names: Dict[Tuple[str, SiteKey], str] = {}
+        self._taken: Set[str] = set()
+
+    def name(self, key: SiteKey, prefix: str = "_mixin_inj") -> str:
+        name = self._names.get((prefix, key))
+        if name is None:
+            name = base = site_var(key, prefix)
+            n = 1
+            while name in self._taken:
+                name = f"{base}_{n}"
+                n += 1
+            self._taken.add(name)
+            self._names[(prefix, key)] = name
+        return name
+
+_SITE_NAMES_ATTR = "_mixin_site_names"
+
+def bind_site_names(fn: ast.AST, names: Optional[SiteNames]) -> None:
+    """Attach the module's ``names`` to ``fn`` while its handlers run; ``None`` detaches."""
+    if names is None:
+        fn.__dict__.pop(_SITE_NAMES_ATTR, None)
+    else:
+        setattr(fn, _SITE_NAMES_ATTR, names)
+
+def site_name(fn: ast.AST, key: SiteKey, prefix: str = "_mixin_inj") -> str:
+    """Site variable for ``key`` as seen from ``fn``; plain ``site_var`` outside a weave."""
+    names = fn.__dict__.get(_SITE_NAMES_ATTR)
+    return site_var(key, prefix) if names is None else names.name(key, prefix)
+
+def site_guarded(injectors: List[InjectorSpec]) -> bool:
+    """True when every injector at a site supplies a ``fast_guard``."""
+    return bool(injectors) and all(s.fast_guard is not None for s in injectors)
+
 _HANDLERS: dict[TYPE, TypeHandler] = {}
 
 def register_handler(handler: TypeHandler) -> None:
     _HANDLERS[handler.type] = handler
 
+def register_handlers(handlers: Iterable[TypeHandler]) -> None:
+    _HANDLERS.update((h.type, h) for h in handlers)
+
 def get_handler(t: TYPE) -> TypeHandler:
     return _HANDLERS[t]
@@ -6,21 +6,55 @@ import ast
 import hashlib
 import marshal
 import pathlib
+from typing import Dict, Tuple
 
 from .transformer import MixinTransformer
 from .debug import maybe_dump
 from .bootstrap import ensure_module_globals
-from .weave import build_injector_map
+from .weave import build_guard_map, build_injector_map
 from .registry import REGISTRY
 
 
-def _injectors_fingerprint() -> str:
-    """Produce a short hash that changes whenever the registered injectors change."""
-    parts = []
+_MAGIC = importlib.util.MAGIC_NUMBER.hex()
+
+
+# module name -> (registry, registry version, fingerprint)
+_FP_CACHE: Dict[str, Tuple[object, int, str]] = {}
+
+def _injectors_fingerprint(module_name: str) -> str:
+    """Produce a short hash that changes whenever the injectors woven into ``module_name`` change.
+
+    Only targets inside the module contribute, so registering a patch for one
+    module does not invalidate the cached weave of every other module. The
+    callback facts the weaver branches on are part of the key as well.
+    Results are reused until the registry's injectors change.
+    """
+    version = REGISTRY.version()
+    cached = _FP_CACHE.get(module_name)
+    if cached is not None and cached[0] is REGISTRY and cached[1] == version:
+        return cached[2]
+    # The registry keeps targets in insertion order and each spec list sorted,
+    # so the digest can be fed incrementally without sorting.
+    h = hashlib.blake2b(digest_size=8)
     for (target, method), specs in REGISTRY.iter_injectors():
+        if not (target == module_name or target.startswith(module_name + ".")):
+            continue
         for s in specs:
-            parts.append(f"{target}:{method}:{s.at.type.value}:{s.at.name}:{getattr(s.callback, '__qualname__', '')}")
-    return hashlib.md5("\n".join(sorted(parts)).encode()).hexdigest()
+            h.update(
+                f"{target}\0{method}\0{s.at.type.value}\0{s.at.name}\0{s.at.selector!r}\0{s.at.location!r}\0"
+                f"{getattr(s.callback, '__qualname__', '')}\0"
+                f"{s.uses_context:d}{s.uses_locals:d}{s.may_cancel:d}{s.may_set_value:d}{s.fast_guard is not None:d}"
+                f"{s.noop:d}\0{s.const_action!r}\n".encode()
+            )
+    fp = h.hexdigest()
+    _FP_CACHE[module_name] = (REGISTRY, version, fp)
+    return fp
+
+
+def _has_injectors(module_name: str) -> bool:
+    """True if any registered injector targets ``module_name`` or something inside it."""
+    return any(target == module_name or target.startswith(module_name + ".")
+               for (target, _method), specs in REGISTRY.iter_injectors() if specs)
 
 
 def _inject_class_members(module: types.ModuleType) -> None:
@@ -44,45 +78,79 @@ def _inject_class_members(module: types.ModuleType) -> None:
             setattr(obj, name, member)
 
 
+# source path -> (cache key, code) for weaves done or loaded in this process,
+# so re-imports (reload_target) of an unchanged module skip the disk cache.
+_CODE_CACHE: Dict[str, Tuple[str, types.CodeType]] = {}
+
+
+def _read_cache_file(cache_file: pathlib.Path) -> bytes:
+    fd = os.open(cache_file, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+
+
 class MixinLoader(importlib.machinery.SourceFileLoader):
     _CACHE_DIR = pathlib.Path("__pycache__") / "mixin_weaved"
 
     def get_code(self, fullname):
         path = self.get_filename(fullname)
-        source_bytes = self.get_data(path)
 
         # ---- bytecode cache look-up ----
-        src_hash = hashlib.md5(source_bytes).hexdigest()
-        inj_hash = _injectors_fingerprint()
-        cache_key = f"{src_hash}_{inj_hash}"
-        safe_name = fullname.replace(".", "_")
+        # Keyed like a timestamp pyc: a hit costs one stat(), not a read and
+        # hash of the source.
+        st = self.path_stats(path)
+        src_key = f"{int(st['mtime'] * 1e9):x}-{st['size']:x}"
+        inj_hash = _injectors_fingerprint(fullname)
+        # marshal output is only readable by the interpreter that wrote it
+        cache_key = f"{src_key}_{inj_hash}_{_MAGIC}"
+        # "-" never occurs in a module name, so distinct modules (``a.b`` vs
+        # ``a_b``) never share a cache name or prune each other's files
+        safe_name = fullname.replace(".", "-")
+        cached = _CODE_CACHE.get(path)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
         cache_file = self._CACHE_DIR / f"{safe_name}.{cache_key}.pyc"
 
-        if cache_file.exists():
-            try:
-                with open(cache_file, "rb") as fh:
-                    return marshal.loads(fh.read())
-            except Exception:
-                pass  # stale / corrupt cache; fall through to recompile
+        try:
+            code = marshal.loads(_read_cache_file(cache_file))
+            _CODE_CACHE[path] = (cache_key, code)
+            return code
+        except Exception:
+            pass  # missing / corrupt cache; fall through to recompile
 
-        code = self.source_to_code(source_bytes, path)
+        code = self.source_to_code(self.get_data(path), path)
+        _CODE_CACHE[path] = (cache_key, code)
 
         # Write cache
         try:
             self._CACHE_DIR.mkdir(parents=True, exist_ok=True)
-            with open(cache_file, "wb") as fh:
+            # write-then-rename so a concurrent import never reads a torn file
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, "wb") as fh:
                 fh.write(marshal.dumps(code))
+            os.replace(tmp_file, cache_file)
+            # weaves of an older version of this source can never be hit again
+            for stale in self._CACHE_DIR.glob(f"{safe_name}.*.pyc"):
+                if not stale.name.startswith(f"{safe_name}.{src_key}_"):
+                    stale.unlink(missing_ok=True)
         except Exception:
             pass  # caching is best-effort
 
         return code
 
     def source_to_code(self, data, path, *, _optimize=-1):
-        source = data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else data
         module_name = self.name
+        debug = os.getenv("MIXIN_DEBUG") == "True"
+        if not debug and not _has_injectors(module_name):
+            # Nothing to weave: compile the source directly instead of building
+            # and re-walking a Python-level AST for an unchanged module.
+            return compile(data, path, "exec", dont_inherit=True, optimize=_optimize)
+        source = data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else data
         tree = ast.parse(source, filename=path)
-        tree = MixinTransformer(module_name=module_name, debug=os.getenv("MIXIN_DEBUG")=="True").visit(tree)
-        ast.fix_missing_locations(tree)
+        # MixinTransformer locates every node it adds
+        tree = MixinTransformer(module_name=module_name, debug=debug).visit(tree)
         maybe_dump(module_name, tree)
         return compile(tree, path, "exec", dont_inherit=True, optimize=_optimize)
 
@@ -92,6 +160,7 @@ class MixinLoader(importlib.machinery.SourceFileLoader):
         # Build injector mapping for this module (targets within this module)
         inj_map = build_injector_map(module.__name__)
         module.__dict__["__mixin_injectors__"].update(inj_map)
+        module.__dict__["__mixin_guards__"].update(build_guard_map(module.__name__))
         super().exec_module(module)
         # Structural injection: set new class members after the module is executed
         _inject_class_members(module)
@@ -99,11 +168,13 @@ class MixinLoader(importlib.machinery.SourceFileLoader):
 
 class MixinFinder(importlib.abc.MetaPathFinder):
     def find_spec(self, fullname, path, target=None):
+        # Decide from the registry before touching the filesystem: most imports
+        # (stdlib, site-packages) have no targets and go to the normal finders.
+        if fullname.startswith("mixpy") or fullname not in REGISTRY.target_prefixes():
+            return None
         spec = importlib.machinery.PathFinder.find_spec(fullname, path)
         if not spec or not isinstance(spec.loader, importlib.machinery.SourceFileLoader):
             return None
-        if fullname.startswith("mixpy"):
-            return None
         spec.loader = MixinLoader(fullname, spec.origin)
         return spec
 
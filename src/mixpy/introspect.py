@@ -0,0 +1,148 @@
+from __future__ import annotations
+import ast
+import dis
+import inspect
+import textwrap
+from functools import lru_cache
+from typing import Any, Callable, FrozenSet, Optional, Tuple
+
+# Static inspection of injector callbacks. The weaver uses these facts to skip
+# work a callback can never observe; anything that cannot be analysed is
+# treated as using everything.
+
+_ATTR_OPS = frozenset({"LOAD_ATTR", "LOAD_METHOD", "STORE_ATTR", "DELETE_ATTR"})
+# Names that can reach ``ci`` through the frame rather than by name.
+_FRAME_READERS = frozenset({"locals", "vars", "eval", "exec", "globals", "_getframe", "currentframe", "f_locals", "f_back"})
+
+# CallbackInfo members that read the dispatch context dict.
+CONTEXT_READERS = frozenset({"_ctx", "get_context", "get_locals", "get_value", "get_parameter", "parameter_name"})
+# Members that can observe the frame's locals() snapshot.
+LOCALS_READERS = frozenset({"_ctx", "get_context", "get_locals"})
+# CallbackInfo members that cancel or replace the current value.
+CANCEL_WRITERS = frozenset({"cancel", "_cancelled", "_result"})
+VALUE_WRITERS = frozenset({"set_value", "set_return_value", "set_parameter", "_value_set", "_new_value"})
+
+
+@lru_cache(maxsize=None)
+def ci_members(fn: Callable) -> Optional[FrozenSet[str]]:
+    """Return the ``CallbackInfo`` members ``fn`` touches, or None if ``ci`` escapes.
+
+    ``ci`` is the second positional parameter of a plain function callback.
+    It escapes when it is passed on, stored, rebound, captured by a closure,
+    or when ``fn`` names something that can read its frame. Bound methods and
+    other callables shift the parameters and are not analysed.
+    """
+    if not inspect.isfunction(fn):
+        return None
+    code = fn.__code__
+    if code.co_argcount < 2 or _FRAME_READERS.intersection(code.co_names):
+        return None
+    ci = code.co_varnames[1]
+    if ci in code.co_cellvars:
+        return None
+    used = set()
+    instrs = list(dis.get_instructions(code))
+    for i, ins in enumerate(instrs):
+        if ins.opname in ("STORE_FAST", "DELETE_FAST") and ins.argval == ci:
+            return None
+        if not ins.opname.startswith("LOAD_FAST"):
+            continue
+        names = ins.argval if isinstance(ins.argval, tuple) else (ins.argval,)
+        if ci not in names:
+            continue
+        nxt = instrs[i + 1] if i + 1 < len(instrs) else None
+        if names.index(ci) != len(names) - 1 or nxt is None or nxt.opname not in _ATTR_OPS:
+            return None
+        used.add(nxt.argval)
+    return frozenset(used)
+
+
+def _touches(fn: Callable, members: FrozenSet[str]) -> bool:
+    used = ci_members(fn)
+    return used is None or bool(used & members)
+
+
+def uses_context(fn: Callable) -> bool:
+    """True unless ``fn`` provably never reads ``ci``'s context."""
+    return _touches(fn, CONTEXT_READERS)
+
+
+def uses_locals(fn: Callable) -> bool:
+    """True unless ``fn`` provably never reads the ``locals`` context entry."""
+    return _touches(fn, LOCALS_READERS)
+
+
+def may_cancel(fn: Callable) -> bool:
+    """True unless ``fn`` provably never cancels."""
+    return _touches(fn, CANCEL_WRITERS)
+
+
+def may_set_value(fn: Callable) -> bool:
+    """True unless ``fn`` provably never replaces the value."""
+    return _touches(fn, VALUE_WRITERS)
+
+
+_TRIVIAL_OPS = frozenset({"RESUME", "NOP", "CACHE"})
+
+
+@lru_cache(maxsize=None)
+def is_noop(fn: Callable) -> bool:
+    """True when ``fn``'s body does nothing (``pass``, a docstring or a bare ``return``)."""
+    code = getattr(fn, "__code__", None)
+    if code is None or hasattr(fn, "__wrapped__"):
+        return False
+    if code.co_flags & (inspect.CO_GENERATOR | inspect.CO_COROUTINE | inspect.CO_ASYNC_GENERATOR):
+        return False
+    ops = [(ins.opname, ins.argval) for ins in dis.get_instructions(code) if ins.opname not in _TRIVIAL_OPS]
+    return ops in ([("LOAD_CONST", None), ("RETURN_VALUE", None)], [("RETURN_CONST", None)])
+
+
+# ci methods a const action may consist of, and the effect each one has.
+_CONST_ACTIONS = {"cancel": "cancel", "set_value": "set_value", "set_return_value": "set_value", "set_parameter": "set_value"}
+_LITERAL_TYPES = (bool, int, float, complex, str, bytes, type(None))
+
+
+def const_action(fn: Callable) -> Optional[Tuple[str, Any]]:
+    """Classify callbacks whose whole body is ``ci.cancel(<literal>)`` or ``ci.set_value(<literal>)``.
+
+    Returns ``("cancel", value)`` / ``("set_value", value)``, or None when the
+    body does anything else or the source cannot be read.
+    """
+    code = getattr(fn, "__code__", None)
+    if code is None or code.co_argcount < 2 or hasattr(fn, "__wrapped__"):
+        return None
+    if code.co_flags & (inspect.CO_GENERATOR | inspect.CO_COROUTINE | inspect.CO_ASYNC_GENERATOR):
+        return None
+    try:
+        tree = ast.parse(textwrap.dedent(inspect.getsource(fn)))
+    except (OSError, TypeError, SyntaxError):
+        return None
+    node = tree.body[0] if tree.body else None
+    if not isinstance(node, ast.FunctionDef) or node.name != code.co_name:
+        return None
+    body = node.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str):
+        body = body[1:]  # docstring
+    if len(body) != 1 or not isinstance(body[0], ast.Expr) or not isinstance(body[0].value, ast.Call):
+        return None
+    call = body[0].value
+    func = call.func
+    if not (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)
+            and func.value.id == code.co_varnames[1] and func.attr in _CONST_ACTIONS):
+        return None
+    kind = _CONST_ACTIONS[func.attr]
+    if kind == "cancel" and not call.args and len(call.keywords) == 1 and call.keywords[0].arg == "result":
+        arg: Optional[ast.expr] = call.keywords[0].value
+    elif not call.keywords and len(call.args) == 1:
+        arg = call.args[0]
+    elif kind == "cancel" and not call.args and not call.keywords:
+        arg = ast.Constant(value=None)
+    else:
+        return None
+    try:
+        value = ast.literal_eval(arg)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+    if type(value) not in _LITERAL_TYPES:
+        return None
+    return kind, value
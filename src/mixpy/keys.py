@@ -0,0 +1,24 @@
+from __future__ import annotations
+from dataclasses import fields, is_dataclass
+from typing import Any, Hashable
+
+# Cache keys for spec values. Plain equality conflates values that weave
+# differently (``1 == 1.0 == True``), and ``repr`` conflates distinct objects
+# that print alike (two classes with the same qualname), so every leaf is
+# keyed by its exact type as well as its value.
+
+
+def value_key(value: Any) -> Hashable:
+    """Return a hashable key that is equal only for interchangeable values.
+
+    Frozen spec dataclasses and tuples are keyed field by field; any other
+    value by ``(type, value)``. Raises TypeError for unhashable leaves, like
+    ``hash`` would.
+    """
+    cls = type(value)
+    if cls is tuple:
+        return (tuple, tuple(value_key(v) for v in value))
+    if is_dataclass(value) and not isinstance(value, type):
+        return (cls, tuple(value_key(getattr(value, f.name)) for f in fields(value) if f.compare))
+    hash(value)
+    return (cls, value)
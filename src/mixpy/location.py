@@ -6,7 +6,7 @@ if TYPE_CHECKING:
     from .model import At
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LineSpec:
     """Select injection points at specific source line numbers (1-based, matching AST ``lineno``).
 
@@ -17,7 +17,7 @@ class LineSpec:
     lineno: int
     end_lineno: Optional[int] = None  # inclusive upper bound; None → exact match
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SliceSpec:
     """Limit matches to a region between anchors.
 
@@ -30,13 +30,13 @@ class SliceSpec:
     include_from: bool = False
     include_to: bool = False
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class NearSpec:
     """Keep matches within max_distance of anchor (measured in *statements*)."""
     anchor: "At"
     max_distance: int = 3
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AnchorSpec:
     """Pick a match relative to anchor.
 
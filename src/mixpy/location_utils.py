@@ -1,9 +1,10 @@
 from __future__ import annotations
 import ast
+from bisect import bisect_left, bisect_right
 from typing import Dict, List, Optional, Tuple
 
 from .model import At, Loc, OCCURRENCE
-from .handlers import get_handler
+from .handlers import NodeIndex, get_handler, node_index
 from .location import SliceSpec, NearSpec, AnchorSpec, LineSpec
 
 def _dotted_name_from_attribute(n: ast.AST):
@@ -20,149 +21,175 @@ def _dotted_name_from_attribute(n: ast.AST):
             return tuple(reversed(parts))
     return None
 
-def _build_parent_map(root: ast.AST) -> Dict[int, ast.AST]:
-    parents: Dict[int, ast.AST] = {}
-    for parent in ast.walk(root):
-        for child in ast.iter_child_nodes(parent):
-            parents[id(child)] = parent
-    return parents
-
-def _enclosing_stmt(node: ast.AST, parents: Dict[int, ast.AST]) -> Optional[ast.stmt]:
-    cur = node
-    while True:
-        if isinstance(cur, ast.stmt) and not isinstance(cur, ast.FunctionDef):
-            return cur
-        p = parents.get(id(cur))
-        if p is None:
-            return None
-        cur = p
+def _attr_path_is(n: ast.AST, parts: Tuple[str, ...]) -> bool:
+    """Like ``_dotted_name_from_attribute(n) == parts``, but bails at the first mismatch."""
+    i = len(parts) - 1
+    cur = n
+    while isinstance(cur, ast.Attribute):
+        if i < 1 or cur.attr != parts[i]:
+            return False
+        i -= 1
+        cur = cur.value
+    return i == 0 and isinstance(cur, ast.Name) and cur.id == parts[0]
+
+# Statement-list fields walked per node type, in visiting order; Try's
+# handler bodies follow its finalbody.
+_STMT_BLOCKS: Dict[type, Tuple[str, ...]] = {
+    ast.FunctionDef: ("body",),
+    ast.AsyncFunctionDef: ("body",),
+    ast.ClassDef: ("body",),
+    ast.With: ("body",),
+    ast.AsyncWith: ("body",),
+    ast.If: ("body", "orelse"),
+    ast.For: ("body", "orelse"),
+    ast.AsyncFor: ("body", "orelse"),
+    ast.While: ("body", "orelse"),
+    ast.Try: ("body", "orelse", "finalbody"),
+    ast.TryStar: ("body", "orelse", "finalbody"),
+}
 
 def _iter_stmts_in_order(fn: ast.FunctionDef) -> List[ast.stmt]:
     out: List[ast.stmt] = []
-    def walk_block(stmts: List[ast.stmt]):
-        for s in stmts:
-            out.append(s)
-            for field in ("body", "orelse", "finalbody"):
-                blk = getattr(s, field, None)
-                if isinstance(blk, list) and blk and all(isinstance(x, ast.stmt) for x in blk):
-                    walk_block(blk)
-            if isinstance(s, ast.Try):
-                for h in s.handlers:
-                    walk_block(h.body)
-    walk_block(fn.body)
+    stack = [iter(fn.body)]
+    while stack:
+        s = next(stack[-1], None)
+        if s is None:
+            stack.pop()
+            continue
+        out.append(s)
+        blocks = [getattr(s, f) for f in _STMT_BLOCKS.get(type(s), ())]
+        if isinstance(s, ast.Try):
+            blocks.extend(h.body for h in s.handlers)
+        # push in reverse so the first block is walked first
+        stack.extend(iter(b) for b in reversed(blocks) if b)
     return out
 
 def _stmt_index(fn: ast.FunctionDef) -> Dict[int, int]:
     stmts = _iter_stmts_in_order(fn)
     return {id(s): i for i, s in enumerate(stmts)}
 
-def _dfs_preorder(root: ast.AST) -> List[ast.AST]:
-    out: List[ast.AST] = []
-    stack: List[ast.AST] = [root]
-    while stack:
-        node = stack.pop()
-        out.append(node)
-        children = list(ast.iter_child_nodes(node))
-        stack.extend(reversed(children))
-    return out
+# (enclosing statement, statement order, pre-order positions) for one function
+_Tables = Tuple[Dict[int, Optional[ast.stmt]], Dict[int, int], Dict[int, int]]
 
-def _intra_index(stmt: ast.stmt) -> Dict[int, int]:
-    nodes = _dfs_preorder(stmt)
-    return {id(n): i for i, n in enumerate(nodes)}
+def _enclosing_map(idx: NodeIndex) -> Dict[int, Optional[ast.stmt]]:
+    # Nearest enclosing statement other than a plain ``def`` for every node,
+    # in one pre-order pass: parents are resolved before their children.
+    out: Dict[int, Optional[ast.stmt]] = {}
+    for n in idx.order:
+        if isinstance(n, ast.stmt) and not isinstance(n, ast.FunctionDef):
+            out[id(n)] = n
+        else:
+            p = idx.parent(n)
+            out[id(n)] = out.get(id(p)) if p is not None else None
+    return out
 
-def _order_key(fn: ast.FunctionDef, node: ast.AST, parents: Dict[int, ast.AST], stmt_idx: Dict[int, int]) -> Tuple[int, int]:
-    stmt = _enclosing_stmt(node, parents)
+def _fn_tables(fn: ast.FunctionDef) -> _Tables:
+    # Everything is derived from the shared node index and memoized on it, so
+    # anchors and nested location filters reuse the tables until the next
+    # rewrite invalidates the index.
+    idx = node_index(fn)
+    memo = idx.memo
+    if "stmt_idx" not in memo:
+        memo["stmt_idx"] = _stmt_index(fn)
+        memo["enclosing"] = _enclosing_map(idx)
+    return memo["enclosing"], memo["stmt_idx"], idx.positions
+
+def _order_key(node: ast.AST, tables: _Tables) -> Tuple[int, int]:
+    enclosing, stmt_idx, positions = tables
+    stmt = enclosing.get(id(node))
     if stmt is None:
         return (-1, -1)
     si = stmt_idx.get(id(stmt), -1)
-    intra = _intra_index(stmt)
-    ii = intra.get(id(node), intra.get(id(stmt), 0))
+    # The function-wide pre-order position orders nodes inside one statement
+    # exactly as a walk of that statement would, without re-walking it.
+    ii = positions.get(id(node), positions.get(id(stmt), 0))
     return (si, ii)
 
+def _stmt_of(key: Tuple[int, int]) -> int:
+    return key[0]
+
 def _find_matches_raw(fn: ast.FunctionDef, at: At):
     handler = get_handler(at.type)
     return handler.find(fn, at)
 
-def _anchor_pos(fn: ast.FunctionDef, parents: Dict[int, ast.AST], stmt_idx: Dict[int, int], anchor_at: At) -> Optional[Tuple[int, int]]:
+def _anchor_pos(fn: ast.FunctionDef, tables: _Tables, anchor_at: At) -> Optional[Tuple[int, int]]:
     raw = _find_matches_raw(fn, anchor_at)
     matches = apply_location(fn, raw, anchor_at)
     if not matches:
         return None
-    keys = sorted(_order_key(fn, m.node, parents, stmt_idx) for m in matches)
-    return keys[0] if keys else None
+    return min(_order_key(m.node, tables) for m in matches)
 
 def apply_location(fn: ast.FunctionDef, matches, at: At):
     loc: Optional[Loc] = at.location
-    if not loc:
+    if not loc or not matches:
         return matches
-
-    parents = _build_parent_map(fn)
-    stmt_idx = _stmt_index(fn)
-
-    def key(m):
-        return _order_key(fn, m.node, parents, stmt_idx)
-
-    matches_sorted = sorted(matches, key=key)
+    if loc._is_trivial:
+        # Nothing to narrow by position: keep every match (weaving does not
+        # depend on their order), or pick from a lone match without keying.
+        if loc.ordinal is None and loc.occurrence == OCCURRENCE.ALL:
+            return matches
+        if len(matches) == 1:
+            return matches if loc.ordinal is None or loc.ordinal == 0 else []
+
+    tables = _fn_tables(fn)
+
+    # Resolve anchors first: a near/anchor filter whose anchor is missing, or a
+    # slice none of whose given anchors resolve, selects nothing, so the
+    # matches need not be keyed or sorted at all.
+    s: Optional[SliceSpec] = loc.slice
+    start = _anchor_pos(fn, tables, s.from_anchor) if s and s.from_anchor else None
+    end = _anchor_pos(fn, tables, s.to_anchor) if s and s.to_anchor else None
+    if s and (s.from_anchor or s.to_anchor) and start is None and end is None:
+        return []
+    near_pos = _anchor_pos(fn, tables, loc.near.anchor) if loc.near else None
+    if loc.near and near_pos is None:
+        return []
+    anchor_pos = _anchor_pos(fn, tables, loc.anchor.anchor) if loc.anchor else None
+    if loc.anchor and anchor_pos is None:
+        return []
+
+    # Decorate once: every filter below works on the sorted key list, so slice
+    # bounds and anchor picks are bisect lookups instead of per-match scans.
+    keys = [_order_key(m.node, tables) for m in matches]
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    keys = [keys[i] for i in order]
+    matches_sorted = [matches[i] for i in order]
+
+    # slice, near and anchor each narrow one [lo, hi) window over the sorted
+    # keys; the match list is cut once at the end.
+    lo, hi = 0, len(keys)
 
     # slice filter (supports one-sided)
-    if loc.slice:
-        s: SliceSpec = loc.slice
-        start = _anchor_pos(fn, parents, stmt_idx, s.from_anchor) if s.from_anchor else None
-        end = _anchor_pos(fn, parents, stmt_idx, s.to_anchor) if s.to_anchor else None
-
-        def ge(a,b): return a[0] > b[0] or (a[0]==b[0] and a[1] >= b[1])
-        def gt(a,b): return a[0] > b[0] or (a[0]==b[0] and a[1] > b[1])
-        def le(a,b): return a[0] < b[0] or (a[0]==b[0] and a[1] <= b[1])
-        def lt(a,b): return a[0] < b[0] or (a[0]==b[0] and a[1] < b[1])
-
-        def in_range(k):
-            if start is not None:
-                if s.include_from:
-                    if not ge(k, start): return False
-                else:
-                    if not gt(k, start): return False
-            if end is not None:
-                if s.include_to:
-                    if not le(k, end): return False
-                else:
-                    if not lt(k, end): return False
-            return True
-
-        matches_sorted = [m for m in matches_sorted if in_range(key(m))]
+    if s:
+        if start is not None:
+            lo = bisect_left(keys, start) if s.include_from else bisect_right(keys, start)
+        if end is not None:
+            hi = bisect_right(keys, end) if s.include_to else bisect_left(keys, end)
+        hi = max(lo, hi)
 
     # near filter (statement distance)
     if loc.near:
         n: NearSpec = loc.near
-        apos = _anchor_pos(fn, parents, stmt_idx, n.anchor)
-        if apos is None:
-            matches_sorted = []
-        else:
-            a_stmt = apos[0]
-            matches_sorted = [m for m in matches_sorted if abs(key(m)[0] - a_stmt) <= n.max_distance]
+        a_stmt = near_pos[0]
+        lo = bisect_left(keys, a_stmt - n.max_distance, lo, hi, key=_stmt_of)
+        hi = max(lo, bisect_right(keys, a_stmt + n.max_distance, lo, hi, key=_stmt_of))
 
     # anchor-relative selection
     if loc.anchor:
         a: AnchorSpec = loc.anchor
-        apos = _anchor_pos(fn, parents, stmt_idx, a.anchor)
-        if apos is None:
-            matches_sorted = []
+        apos = anchor_pos
+        if a.offset >= 0:
+            first = bisect_left(keys, apos, lo, hi) if a.inclusive else bisect_right(keys, apos, lo, hi)
+            pick = first + a.offset
+            ok = pick < hi
         else:
-            items = [(key(m), m) for m in matches_sorted]
-            items.sort(key=lambda t: t[0])
-
-            def gt_(x,y): return x[0] > y[0] or (x[0]==y[0] and x[1] > y[1])
-            def ge_(x,y): return x[0] > y[0] or (x[0]==y[0] and x[1] >= y[1])
-            def lt_(x,y): return x[0] < y[0] or (x[0]==y[0] and x[1] < y[1])
-            def le_(x,y): return x[0] < y[0] or (x[0]==y[0] and x[1] <= y[1])
-
-            if a.offset >= 0:
-                cand = [t for t in items if (ge_(t[0], apos) if a.inclusive else gt_(t[0], apos))]
-                pick = a.offset
-            else:
-                cand = [t for t in items if (le_(t[0], apos) if a.inclusive else lt_(t[0], apos))]
-                cand = list(reversed(cand))
-                pick = (-a.offset) - 1
-            matches_sorted = [cand[pick][1]] if 0 <= pick < len(cand) else []
+            # walk backwards from the last candidate before (or at) the anchor
+            last = bisect_right(keys, apos, lo, hi) if a.inclusive else bisect_left(keys, apos, lo, hi)
+            pick = last + a.offset
+            ok = pick >= lo
+        lo, hi = (pick, pick + 1) if ok else (lo, lo)
+
+    matches_sorted = matches_sorted[lo:hi]
 
     # line-number filter: applied before occurrence/ordinal so those selectors
     # pick from the line-restricted candidate set.
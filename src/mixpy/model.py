@@ -1,8 +1,9 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Optional, Dict
 
+from .keys import value_key
 from .location import SliceSpec, NearSpec, AnchorSpec, LineSpec
 from .selector import NameSelector, QualifiedSelector, ConstSelector, AttrSelector, CallSelector
 
@@ -36,7 +37,7 @@ class OCCURRENCE(str, Enum):
     FIRST = "FIRST"
     LAST = "LAST"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class When:
     """Safe condition DSL node."""
     left: str
@@ -45,17 +46,17 @@ class When:
 
     @staticmethod
     def and_(*conds: 'When') -> 'When':
-        return When(left="__and__", op=OP.AND, right=list(conds))
+        return When(left="__and__", op=OP.AND, right=tuple(conds))
 
     @staticmethod
     def or_(*conds: 'When') -> 'When':
-        return When(left="__or__", op=OP.OR, right=list(conds))
+        return When(left="__or__", op=OP.OR, right=tuple(conds))
 
     @staticmethod
     def not_(cond: 'When') -> 'When':
         return When(left="__not__", op=OP.NOT, right=cond)
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Loc:
     """Location constraints (extensible)."""
     ordinal: Optional[int] = None           # match the Nth occurrence (0-based)
@@ -65,13 +66,18 @@ class Loc:
     near: Optional[NearSpec] = None         # limit to neighborhood of anchor (statement distance)
     anchor: Optional[AnchorSpec] = None     # select relative to anchor
     line: Optional[LineSpec] = None         # filter by source line number
+    # True when no slice/near/anchor/line filter is set, so only the
+    # occurrence/ordinal picks (if any) apply to the handler's matches.
+    _is_trivial: bool = field(default=False, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         occ = self.occurrence
         if not isinstance(occ, OCCURRENCE):
             raise TypeError("occurrence must be an OCCURRENCE enum value.")
+        trivial = self.slice is None and self.near is None and self.anchor is None and self.line is None
+        object.__setattr__(self, "_is_trivial", trivial)
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class At:
     type: TYPE
     name: Any = None        # string for invoke/attribute, literal for const, arg name for parameter
@@ -84,3 +90,27 @@ class At:
     @property
     def condition(self) -> Optional[When]:
         return self.location.condition if self.location else None
+
+
+_CANONICAL: Dict[Any, Any] = {}
+_CANONICAL_MAX = 4096
+
+def canonical(spec: Any) -> Any:
+    """Return the shared instance equal to ``spec``, registering it on first use.
+
+    Specs are keyed by :func:`value_key`, so values that compare equal but
+    weave differently (``1`` vs ``1.0`` vs ``True``) stay distinct. Unhashable
+    specs are returned as they are. Sharing is an optimisation only, so the
+    table is simply reset once it grows past ``_CANONICAL_MAX`` entries.
+    """
+    try:
+        key = value_key(spec)
+    except TypeError:
+        return spec
+    shared = _CANONICAL.get(key)
+    if shared is None:
+        if len(_CANONICAL) >= _CANONICAL_MAX:
+            _CANONICAL.clear()
+        shared = _CANONICAL[key] = spec
+    return shared
+
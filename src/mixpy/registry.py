@@ -1,10 +1,12 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Tuple
+import sys
+from bisect import insort
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
 from .model import At, POLICY
 from .errors import MixinMatchError
 
-@dataclass
+@dataclass(slots=True)
 class InjectorSpec:
     mixin_cls: Optional[type]
     callback: Callable
@@ -16,6 +18,26 @@ class InjectorSpec:
     policy: POLICY = POLICY.ERROR
     mixin_priority: int = 100
     registration_index: int = 0
+    # False when the callback provably never does the thing (see introspect);
+    # the weaver drops the matching prologue work.
+    uses_context: bool = True
+    uses_locals: bool = True
+    may_cancel: bool = True
+    may_set_value: bool = True
+    # ("cancel" | "set_value", literal) when the callback body is exactly that
+    # one call; a lone unconditional injector is then woven as its effect.
+    const_action: Optional[Tuple[str, Any]] = None
+    # True when the callback body is empty and no match count is enforced;
+    # the weaver leaves such injectors out entirely.
+    noop: bool = False
+    # INVOKE only: fast_guard(self) -> True means the injector would be a no-op,
+    # so the woven call site skips dispatch when every injector there agrees.
+    fast_guard: Optional[Callable[[Any], bool]] = None
+    # resolver order key, computed once by Registry.register_injector
+    sort_key: Tuple = field(default=(), repr=False, compare=False)
+
+def _sort_key_of(spec: InjectorSpec) -> Tuple:
+    return spec.sort_key
 
 class Registry:
     def __init__(self) -> None:
@@ -25,6 +47,11 @@ class Registry:
         self._class_members: Dict[str, List[Tuple[str, Any]]] = {}  # target -> [(name, obj)]
         self._frozen = False
         self._next_index = 0
+        # bumped whenever the registered injectors change
+        self._version = 0
+        self._target_prefixes: Optional[FrozenSet[str]] = None
+        # read-only snapshot of _injectors, valid while frozen
+        self._frozen_injectors: Optional[Dict[Tuple[str, str], Tuple[InjectorSpec, ...]]] = None
 
     def register_mixin(self, target: str, mixin_cls: type, priority: int = 100) -> None:
         if self._frozen:
@@ -33,6 +60,7 @@ class Registry:
                 f"for target '{target}'.\n"
                 "  Tip: Import all patch modules *before* calling mixpy.init()."
             )
+        target = sys.intern(target)
         self._targets.setdefault(target, []).append(mixin_cls)
         self._target_priorities[(target, mixin_cls)] = int(priority)
 
@@ -50,13 +78,19 @@ class Registry:
                 f"(method='{spec.method}', target='{target}').\n"
                 "  Tip: Import all patch modules *before* calling mixpy.init()."
             )
+        # keys built from runtime strings (dotted targets) then compare by identity
+        target = sys.intern(target)
+        spec.method = sys.intern(spec.method)
         if spec.mixin_cls is not None:
             spec.mixin_priority = self._target_priorities.get((target, spec.mixin_cls), spec.mixin_priority)
         spec.registration_index = self._next_index
         self._next_index += 1
+        spec.sort_key = self._injector_sort_key(spec)
         key = (target, spec.method)
-        self._injectors.setdefault(key, []).append(spec)
-        self._injectors[key].sort(key=self._injector_sort_key)
+        self._target_prefixes = None
+        self._version += 1
+        # keep each list in resolver order; registration_index makes keys unique
+        insort(self._injectors.setdefault(key, []), spec, key=_sort_key_of)
 
     def register_class_member(self, target: str, name: str, obj: Any) -> None:
         """Register a new method/property/attribute to inject into the target class at import time."""
@@ -65,14 +99,17 @@ class Registry:
                 f"Registry is frozen — cannot register class member '{name}' for target '{target}'.\n"
                 "  Tip: Import all patch modules *before* calling mixpy.init()."
             )
+        self._target_prefixes = None
         self._class_members.setdefault(target, []).append((name, obj))
 
-    def get_injectors(self, target: str, method: str) -> List[InjectorSpec]:
+    def get_injectors(self, target: str, method: str) -> Sequence[InjectorSpec]:
+        if self._frozen_injectors is not None:
+            return self._frozen_injectors.get((target, method), ())
         return list(self._injectors.get((target, method), []))
 
     def iter_injectors(self):
-        """Yield ((target, method), specs) for all registered injectors."""
-        yield from self._injectors.items()
+        """Iterate ((target, method), specs) for all registered injectors."""
+        return iter(self._injectors.items())
 
     def iter_class_members(self):
         """Yield (target, [(name, obj)]) for all registered class members."""
@@ -94,17 +131,40 @@ class Registry:
                 "  Tip: Call mixpy.unfreeze() or use reload_target() before unregistering."
             )
         key = (target, method)
+        self._target_prefixes = None
+        self._version += 1
         specs = self._injectors.get(key, [])
         before = len(specs)
         self._injectors[key] = [s for s in specs if s.callback is not callback]
         return len(self._injectors[key]) < before
 
+    def version(self) -> int:
+        """A counter that changes whenever an injector is registered or removed."""
+        return self._version
+
+    def target_prefixes(self) -> FrozenSet[str]:
+        """Every dotted prefix of an injector or class-member target.
+
+        A module can only be affected by the registry if its name is in this
+        set; the import hook uses it to pass over everything else.
+        """
+        if self._target_prefixes is None:
+            prefixes = set()
+            targets = [t for (t, _m), specs in self._injectors.items() if specs]
+            for target in targets + list(self._class_members):
+                parts = target.split(".")
+                prefixes.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+            self._target_prefixes = frozenset(prefixes)
+        return self._target_prefixes
+
     def freeze(self) -> None:
         self._frozen = True
+        self._frozen_injectors = {k: tuple(v) for k, v in self._injectors.items()}
 
     def unfreeze(self) -> None:
         """Allow mutations again (e.g. for hot-reloading)."""
         self._frozen = False
+        self._frozen_injectors = None
 
     def is_frozen(self) -> bool:
         """Return True if the registry is currently frozen."""
@@ -1,18 +1,40 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 import asyncio
+import itertools
+import operator
 import os
-import time
+import re
+from functools import lru_cache
+from .keys import value_key
 from .model import TYPE, When, OP
+from .debug import log_cancel as _log_cancel, log_trace as _log_trace
 
-@dataclass
+# MIXIN_TRACE is read once rather than on every dispatch; configure(trace=...)
+# refreshes it, and so can anyone who changes the variable later.
+_TRACE_ENABLED = False
+
+def refresh_trace_flag() -> None:
+    """Re-read ``MIXIN_TRACE`` into the flag the dispatchers check."""
+    global _TRACE_ENABLED
+    _TRACE_ENABLED = os.getenv("MIXIN_TRACE") == "True"
+
+refresh_trace_flag()
+
+# Process-unique trace ids for woven and runtime dispatch sites; cheaper than a clock read + str().
+_TRACE_COUNTER = itertools.count(1).__next__
+
+@dataclass(slots=True)
 class CallbackInfo:
     type: TYPE
     target: str
     method: str
     at_name: Any
-    trace_id: str
+    trace_id: Any
+    return_value: Any = None  # TAIL: the value being returned
+    exception: Optional[BaseException] = None  # EXCEPTION: the exception being handled
     _cancelled: bool = False
     _result: Any = None
     _value_set: bool = False
@@ -45,6 +67,10 @@ class CallbackInfo:
         """Mutate the return value without cancelling subsequent injectors."""
         self.set_value(new_val)
 
+    def current_return_value(self) -> Any:
+        """TAIL: the return value as left by earlier injectors."""
+        return self._new_value if self._value_set else self.return_value
+
     def get_value(self) -> Any:
         if self._ctx and "value" in self._ctx:
             return self._ctx["value"]
@@ -58,8 +84,9 @@ class CallbackInfo:
     def new_value(self) -> Any:
         return self._new_value
 
-    def get_context(self) -> Dict[str, Any]:
-        return dict(self._ctx or {})
+    def get_context(self) -> Mapping[str, Any]:
+        # a read-only view: no copy per call, and later set_call_args() shows through
+        return MappingProxyType(self._ctx if self._ctx is not None else {})
 
     def get_locals(self) -> Dict[str, Any]:
         if self._ctx and "locals" in self._ctx and isinstance(self._ctx["locals"], dict):
@@ -111,71 +138,130 @@ class CallbackInfo:
 def _eval_when(cond: Optional[When], ctx: Dict[str, Any]) -> bool:
     if cond is None:
         return True
-    if cond.op == OP.AND:
-        return all(_eval_when(c, ctx) for c in cond.right)
-    if cond.op == OP.OR:
-        return any(_eval_when(c, ctx) for c in cond.right)
-    if cond.op == OP.NOT:
-        return not _eval_when(cond.right, ctx)
-
-    left_val = _resolve_path(ctx, cond.left)
+    return _compiled_when(cond)(ctx)
+
+def _compiled_when(cond: When) -> Callable[[Dict[str, Any]], bool]:
+    # Keyed by value_key, not When equality: MATCH 1 and MATCH True compare
+    # equal but test different strings.
+    try:
+        key = value_key(cond)
+    except TypeError:  # unhashable operand, e.g. OP.IN against a list
+        entry = _WHEN_BY_ID.get(id(cond))
+        if entry is None or entry[0] is not cond:
+            if len(_WHEN_BY_ID) >= 1024:
+                _WHEN_BY_ID.clear()
+            entry = _WHEN_BY_ID[id(cond)] = (cond, compile_when(cond))
+        return entry[1]
+    pred = _WHEN_CACHE.get(key)
+    if pred is None:
+        pred = _WHEN_CACHE[key] = compile_when(cond)
+    return pred
+
+_WHEN_CACHE: Dict[Any, Callable[[Dict[str, Any]], bool]] = {}
+# Unhashable conditions by identity; the entry keeps ``cond`` alive so its id
+# cannot be reused while cached.
+_WHEN_BY_ID: Dict[int, Tuple[When, Callable[[Dict[str, Any]], bool]]] = {}
+
+_BINARY_OPS: Dict[OP, Callable[[Any, Any], bool]] = {
+    OP.EQ: operator.eq, OP.NE: operator.ne,
+    OP.GT: operator.gt, OP.LT: operator.lt, OP.GE: operator.ge, OP.LE: operator.le,
+    OP.IN: lambda l, r: l in r, OP.NOT_IN: lambda l, r: l not in r,
+    OP.ISINSTANCE: isinstance,
+    OP.LEN_EQ: lambda l, r: len(l) == r, OP.LEN_GT: lambda l, r: len(l) > r, OP.LEN_LT: lambda l, r: len(l) < r,
+}
+
+def compile_when(cond: When) -> Callable[[Dict[str, Any]], bool]:
+    """Turn a ``When`` tree into a predicate over the dispatch context.
+
+    The DSL is walked once here rather than on every dispatch; the returned
+    closure only resolves paths and applies the comparison.
+    """
     op = cond.op
+    if op in (OP.AND, OP.OR):
+        preds = tuple(compile_when(c) for c in cond.right)
+        if len(preds) == 2:  # the common pair, without a generator per call
+            a, b = preds
+            if op == OP.AND:
+                return lambda ctx: bool(a(ctx) and b(ctx))
+            return lambda ctx: bool(a(ctx) or b(ctx))
+        if op == OP.AND:
+            return lambda ctx: all(p(ctx) for p in preds)
+        return lambda ctx: any(p(ctx) for p in preds)
+    if op == OP.NOT:
+        inner = compile_when(cond.right)
+        return lambda ctx: not inner(ctx)
+
+    get = _compile_path(cond.left)
     right = cond.right
-    if op == OP.EQ: return left_val == right
-    if op == OP.NE: return left_val != right
-    if op == OP.GT: return left_val > right
-    if op == OP.LT: return left_val < right
-    if op == OP.GE: return left_val >= right
-    if op == OP.LE: return left_val <= right
-    if op == OP.IN: return left_val in right
-    if op == OP.NOT_IN: return left_val not in right
-    if op == OP.IS_NONE: return left_val is None
-    if op == OP.NOT_NONE: return left_val is not None
-    if op == OP.ISINSTANCE: return isinstance(left_val, right)
+    if op == OP.IS_NONE:
+        return lambda ctx: get(ctx) is None
+    if op == OP.NOT_NONE:
+        return lambda ctx: get(ctx) is not None
     if op == OP.MATCH:
-        import re
-        return re.search(str(right), str(left_val)) is not None
-    if op == OP.LEN_EQ: return len(left_val) == right
-    if op == OP.LEN_GT: return len(left_val) > right
-    if op == OP.LEN_LT: return len(left_val) < right
-    raise ValueError(f"Unsupported OP: {op}")
+        pattern = re.compile(str(right))
+        return lambda ctx: pattern.search(str(get(ctx))) is not None
+    fn = _BINARY_OPS.get(op)
+    if fn is None:
+        raise ValueError(f"Unsupported OP: {op}")
+    return lambda ctx: fn(get(ctx), right)
 
 def _resolve_path(ctx: Dict[str, Any], path: str) -> Any:
     # supports dotted names and simple [index] for list access like args[0]
-    if path in ctx:
-        return ctx[path]
-    cur: Any = ctx
-    import re
-    tokens = re.split(r'\.(?![^\[]*\])', path)
-    for t in tokens:
-        m = re.fullmatch(r'(\w+)(\[(\d+)\])?', t)
+    return _compile_path(path)(ctx)
+
+_PATH_SPLIT = re.compile(r'\.(?![^\[]*\])')
+_PATH_STEP = re.compile(r'(\w+)(\[(\d+)\])?')
+
+@lru_cache(maxsize=None)
+def _compile_path(path: str) -> Callable[[Dict[str, Any]], Any]:
+    steps = []
+    for t in _PATH_SPLIT.split(path):
+        m = _PATH_STEP.fullmatch(t)
         if not m:
-            return None
-        key = m.group(1)
+            steps = None
+            break
         idx = m.group(3)
-        if isinstance(cur, dict):
-            cur = cur.get(key)
-        else:
-            cur = getattr(cur, key, None)
-        if idx is not None and cur is not None:
-            try:
-                cur = cur[int(idx)]
-            except Exception:
-                return None
-    return cur
+        steps.append((m.group(1), None if idx is None else int(idx)))
+    if steps == [(path, None)]:
+        # a bare context key: the dotted walk would read the same entry
+        return lambda ctx: ctx.get(path)
+
+    def resolve(ctx: Dict[str, Any]) -> Any:
+        if path in ctx:
+            return ctx[path]
+        if steps is None:
+            return None
+        cur: Any = ctx
+        for key, idx in steps:
+            if isinstance(cur, dict):
+                cur = cur.get(key)
+            else:
+                cur = getattr(cur, key, None)
+            if idx is not None and cur is not None:
+                try:
+                    cur = cur[idx]
+                except Exception:
+                    return None
+        return cur
+    return resolve
 
 # ---------------- Context normalization ----------------
 
 def _normalize_ctx(ci: CallbackInfo, ctx: Dict[str, Any], *, self_obj: Any, args: List[Any], kwargs: Dict[str, Any]) -> Dict[str, Any]:
-    out = dict(ctx or {})
-    out.setdefault("type", ci.type.value)
-    out.setdefault("target", ci.target)
-    out.setdefault("method", ci.method)
-    out.setdefault("at", ci.at_name)
-    out.setdefault("self", self_obj)
-    out.setdefault("args", list(args))
-    out.setdefault("kwargs", dict(kwargs))
-    out.setdefault("locals", out.get("locals", {}))
+    # One dict display for the defaults, then the site's own entries on top;
+    # ``args``/``kwargs`` are copies the caller made for this context.
+    out = {
+        "type": ci.type.value,
+        "target": ci.target,
+        "method": ci.method,
+        "at": ci.at_name,
+        "self": self_obj,
+        "args": args,
+        "kwargs": kwargs,
+        "locals": {},
+    }
+    if ctx:
+        out.update(ctx)
     return out
 
 
@@ -198,37 +284,46 @@ def merge_kwargs(*maps: Any) -> Dict[str, Any]:
 
 # ---------------- Dispatch ----------------
 
-def dispatch_injectors(injectors: List[Callable], ci: CallbackInfo, ctx: Dict[str, Any], *cb_args, **cb_kwargs):
-    """Call injectors with signature: (self_obj, ci, *args, **kwargs)."""
+def _begin_dispatch(ci: CallbackInfo, ctx: Dict[str, Any], cb_args: tuple, cb_kwargs: Dict[str, Any]) -> Tuple[Any, tuple, bool]:
+    # Shared setup for both dispatchers: returns (self_obj, rest, invoke).
+    # INVOKE callbacks see the current call args; set_call_args keeps the
+    # context's copies in step and never clears them, so whether the loop
+    # passes them is decided once here.
     self_obj = cb_args[0] if cb_args else None
-    rest = list(cb_args[1:]) if len(cb_args) > 1 else []
-    ctx2 = _normalize_ctx(ci, ctx, self_obj=self_obj, args=rest, kwargs=dict(cb_kwargs))
-    ci._ctx = ctx2
+    rest = cb_args[1:]
+    ci._ctx = _normalize_ctx(ci, ctx, self_obj=self_obj, args=list(rest), kwargs=dict(cb_kwargs))
+    invoke = ci.type == TYPE.INVOKE and ci._call_args is not None and ci._call_kwargs is not None
+    return self_obj, rest, invoke
 
-    _trace = os.getenv("MIXIN_TRACE") == "True"
+def dispatch_injectors(injectors: List[Callable], ci: CallbackInfo, ctx: Dict[str, Any], *cb_args, **cb_kwargs):
+    """Call injectors with signature: (self_obj, ci, *args, **kwargs)."""
+    self_obj, rest, invoke = _begin_dispatch(ci, ctx, cb_args, cb_kwargs)
+
+    if not _TRACE_ENABLED:
+        # untraced dispatch (the default): nothing but the calls and the cancel check
+        if invoke:
+            for cb in injectors:
+                cb(self_obj, ci, *ci._call_args, **ci._call_kwargs)
+                if ci._cancelled:
+                    return ci._result
+        else:
+            for cb in injectors:
+                cb(self_obj, ci, *rest, **cb_kwargs)
+                if ci._cancelled:
+                    return ci._result
+        return None
 
     for cb in injectors:
-        args_for_cb = list(rest)
-        kwargs_for_cb = dict(cb_kwargs)
-        if ci.type == TYPE.INVOKE and ci._call_args is not None and ci._call_kwargs is not None:
-            args_for_cb = list(ci._call_args)
-            kwargs_for_cb = dict(ci._call_kwargs)
-            ci._ctx["args"] = list(args_for_cb)
-            ci._ctx["kwargs"] = dict(kwargs_for_cb)
-            ci._ctx["call_args"] = list(args_for_cb)
-            ci._ctx["call_kwargs"] = dict(kwargs_for_cb)
-
-        if _trace:
-            from .debug import log_trace, log_cancel
-            log_trace(ci.target, ci.method, ci.type.value, ci.at_name,
-                      getattr(cb, "__qualname__", str(cb)), ci.trace_id)
-
+        if invoke:
+            args_for_cb, kwargs_for_cb = ci._call_args, ci._call_kwargs
+        else:
+            args_for_cb, kwargs_for_cb = rest, cb_kwargs
+        _log_trace(ci.target, ci.method, ci.type.value, ci.at_name,
+                   getattr(cb, "__qualname__", str(cb)), ci.trace_id)
         cb(self_obj, ci, *args_for_cb, **kwargs_for_cb)
-        if ci.is_cancelled:
-            if _trace:
-                from .debug import log_cancel
-                log_cancel(ci.result)
-            return ci.result
+        if ci._cancelled:
+            _log_cancel(ci._result)
+            return ci._result
     return None
 
 
@@ -238,78 +333,84 @@ async def async_dispatch_injectors(injectors: List[Callable], ci: CallbackInfo,
     Awaits callbacks that return coroutines, enabling ``async def`` callbacks
     inside ``async def`` target methods.
     """
-    self_obj = cb_args[0] if cb_args else None
-    rest = list(cb_args[1:]) if len(cb_args) > 1 else []
-    ctx2 = _normalize_ctx(ci, ctx, self_obj=self_obj, args=rest, kwargs=dict(cb_kwargs))
-    ci._ctx = ctx2
-
-    _trace = os.getenv("MIXIN_TRACE") == "True"
+    self_obj, rest, invoke = _begin_dispatch(ci, ctx, cb_args, cb_kwargs)
+    _trace = _TRACE_ENABLED
 
     for cb in injectors:
-        args_for_cb = list(rest)
-        kwargs_for_cb = dict(cb_kwargs)
-        if ci.type == TYPE.INVOKE and ci._call_args is not None and ci._call_kwargs is not None:
-            args_for_cb = list(ci._call_args)
-            kwargs_for_cb = dict(ci._call_kwargs)
-            ci._ctx["args"] = list(args_for_cb)
-            ci._ctx["kwargs"] = dict(kwargs_for_cb)
-            ci._ctx["call_args"] = list(args_for_cb)
-            ci._ctx["call_kwargs"] = dict(kwargs_for_cb)
+        if invoke:
+            args_for_cb, kwargs_for_cb = ci._call_args, ci._call_kwargs
+        else:
+            args_for_cb, kwargs_for_cb = rest, cb_kwargs
 
         if _trace:
-            from .debug import log_trace, log_cancel
-            log_trace(ci.target, ci.method, ci.type.value, ci.at_name,
+            _log_trace(ci.target, ci.method, ci.type.value, ci.at_name,
                       getattr(cb, "__qualname__", str(cb)), ci.trace_id)
 
         result = cb(self_obj, ci, *args_for_cb, **kwargs_for_cb)
         if asyncio.iscoroutine(result):
             await result
-        if ci.is_cancelled:
+        if ci._cancelled:
             if _trace:
-                from .debug import log_cancel
-                log_cancel(ci.result)
-            return ci.result
+                _log_cancel(ci._result)
+            return ci._result
     return None
 
 # ---------------- Expression-level helpers ----------------
+#
+# Woven code calls the ``*_site`` variants with the injector list it bound at
+# module import; the ``eval_*`` wrappers keep the map-based signature for
+# manual callers. A site with no injectors passes its value (or the original
+# call) straight through without building a CallbackInfo.
 
 def eval_const(inj_map, target: str, method: str, at_name: str, self_obj, const_value):
-    key = (target, method, "CONST", str(at_name))
-    injectors = inj_map.get(key, [])
-    ci = CallbackInfo(type=TYPE.CONST, target=target, method=method, at_name=str(at_name), trace_id=str(time.time_ns()))
+    injectors = inj_map.get((target, method, "CONST", str(at_name)), [])
+    return eval_const_site(injectors, target, method, at_name, self_obj, const_value)
+
+def eval_const_site(injectors, target: str, method: str, at_name: str, self_obj, const_value):
+    if not injectors:
+        return const_value
+    ci = CallbackInfo(type=TYPE.CONST, target=target, method=method, at_name=str(at_name), trace_id=_TRACE_COUNTER())
     ctx = {"value": const_value, "const_value": const_value}
     dispatch_injectors(injectors, ci, ctx, self_obj)
-    if ci.is_cancelled:
-        return ci.result
-    if ci.value_set:
-        return ci.new_value
+    if ci._cancelled:
+        return ci._result
+    if ci._value_set:
+        return ci._new_value
     return const_value
 
 def eval_invoke(inj_map, target: str, method: str, at_name: str, self_obj, call_original, args_list, kwargs_dict):
-    key = (target, method, "INVOKE", str(at_name))
-    injectors = inj_map.get(key, [])
-    ci = CallbackInfo(type=TYPE.INVOKE, target=target, method=method, at_name=str(at_name), trace_id=str(time.time_ns()))
+    injectors = inj_map.get((target, method, "INVOKE", str(at_name)), [])
+    return eval_invoke_site(injectors, target, method, at_name, self_obj, call_original, args_list, kwargs_dict)
+
+def eval_invoke_site(injectors, target: str, method: str, at_name: str, self_obj, call_original, args_list, kwargs_dict):
+    if not injectors:
+        return call_original(*args_list, **kwargs_dict)
+    ci = CallbackInfo(type=TYPE.INVOKE, target=target, method=method, at_name=str(at_name), trace_id=_TRACE_COUNTER())
     ci._call_original = call_original
     ci._call_args = list(args_list)
     ci._call_kwargs = dict(kwargs_dict)
     ctx = {"args": list(args_list), "kwargs": dict(kwargs_dict), "call_args": list(args_list), "call_kwargs": dict(kwargs_dict)}
     dispatch_injectors(injectors, ci, ctx, self_obj, *args_list, **kwargs_dict)
-    if ci.is_cancelled:
-        return ci.result
+    if ci._cancelled:
+        return ci._result
     if ci._original_called:
         return ci._original_result
     return ci.call_original()
 
 def eval_attr_write(inj_map, target: str, method: str, at_name: str, self_obj, new_value):
-    key = (target, method, "ATTRIBUTE", str(at_name))
-    injectors = inj_map.get(key, [])
-    ci = CallbackInfo(type=TYPE.ATTRIBUTE, target=target, method=method, at_name=str(at_name), trace_id=str(time.time_ns()))
+    injectors = inj_map.get((target, method, "ATTRIBUTE", str(at_name)), [])
+    return eval_attr_write_site(injectors, target, method, at_name, self_obj, new_value)
+
+def eval_attr_write_site(injectors, target: str, method: str, at_name: str, self_obj, new_value):
+    if not injectors:
+        return new_value
+    ci = CallbackInfo(type=TYPE.ATTRIBUTE, target=target, method=method, at_name=str(at_name), trace_id=_TRACE_COUNTER())
     ctx = {"value": new_value, "attr": str(at_name)}
     dispatch_injectors(injectors, ci, ctx, self_obj, new_value)
-    if ci.is_cancelled:
-        return ci.result
-    if ci.value_set:
-        return ci.new_value
+    if ci._cancelled:
+        return ci._result
+    if ci._value_set:
+        return ci._new_value
     return new_value
 
 
@@ -321,15 +422,17 @@ def eval_yield(inj_map, target: str, method: str, at_name: str, self_obj, yield_
     substitute an entirely different value (the generator will yield that
     instead).
     """
-    key = (target, method, "YIELD", str(at_name))
-    injectors = inj_map.get(key, [])
+    injectors = inj_map.get((target, method, "YIELD", str(at_name)), [])
+    return eval_yield_site(injectors, target, method, at_name, self_obj, yield_value)
+
+def eval_yield_site(injectors, target: str, method: str, at_name: str, self_obj, yield_value):
     if not injectors:
         return yield_value
-    ci = CallbackInfo(type=TYPE.YIELD, target=target, method=method, at_name=str(at_name), trace_id=str(time.time_ns()))
+    ci = CallbackInfo(type=TYPE.YIELD, target=target, method=method, at_name=str(at_name), trace_id=_TRACE_COUNTER())
     ctx = {"value": yield_value, "yield_value": yield_value}
     dispatch_injectors(injectors, ci, ctx, self_obj, yield_value)
-    if ci.is_cancelled:
-        return ci.result
-    if ci.value_set:
-        return ci.new_value
+    if ci._cancelled:
+        return ci._result
+    if ci._value_set:
+        return ci._new_value
     return yield_value
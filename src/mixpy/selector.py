@@ -1,41 +1,46 @@
 from __future__ import annotations
+import ast
+import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Optional, Sequence, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
 
 # ---- Common name selectors ----
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class NameSelector:
     name: str
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class QualifiedSelector:
     parts: Tuple[str, ...]
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def of(*parts: str) -> "QualifiedSelector":
-        return QualifiedSelector(parts=tuple(parts))
+        return QualifiedSelector(parts=tuple(sys.intern(p) for p in parts))
 
     def as_dotted(self) -> str:
         return ".".join(self.parts)
 
 # ---- CONST selectors ----
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ConstSelector:
     value: Any
     type_name: Optional[str] = None  # e.g. "int","float","str","bool"
 
 # ---- Attribute selectors ----
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AttrSelector:
     parts: Tuple[str, ...]
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def of(*parts: str) -> "AttrSelector":
-        return AttrSelector(parts=tuple(parts))
+        return AttrSelector(parts=tuple(sys.intern(p) for p in parts))
 
     def as_dotted(self) -> str:
         return ".".join(self.parts)
@@ -55,52 +60,59 @@ class STARSTAR_POLICY(str, Enum):
     IGNORE = "IGNORE"
     ASSUME_MATCH = "ASSUME_MATCH"
 
+_ARG_ANY: Dict[type, "ArgAny"] = {}
+
 class ArgPattern:
+    __slots__ = ()
+
     def match(self, node) -> bool:
         raise NotImplementedError
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ArgAny(ArgPattern):
+    def __new__(cls):
+        # stateless, so every ArgAny() is the same instance
+        inst = _ARG_ANY.get(cls)
+        if inst is None:
+            inst = _ARG_ANY[cls] = object.__new__(cls)
+        return inst
+
     def match(self, node) -> bool:
         return True
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ArgConst(ArgPattern):
     value: Any
     def match(self, node) -> bool:
-        import ast
         return isinstance(node, ast.Constant) and node.value == self.value
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ArgName(ArgPattern):
     name: str
     def match(self, node) -> bool:
-        import ast
         return isinstance(node, ast.Name) and node.id == self.name
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ArgAttr(ArgPattern):
     parts: Tuple[str, ...]
     @staticmethod
+    @lru_cache(maxsize=None)
     def of(*parts: str) -> "ArgAttr":
-        return ArgAttr(parts=tuple(parts))
+        return ArgAttr(parts=tuple(sys.intern(p) for p in parts))
     def match(self, node) -> bool:
-        import ast
-        if isinstance(node, ast.Name):
-            return (node.id,) == self.parts
-        if not isinstance(node, ast.Attribute):
-            return False
-        parts=[]
-        cur=node
+        # Walk the chain from the last attribute back, bailing at the first
+        # mismatch; never deeper than len(parts) levels.
+        parts = self.parts
+        i = len(parts) - 1
+        cur = node
         while isinstance(cur, ast.Attribute):
-            parts.append(cur.attr)
-            cur=cur.value
-        if isinstance(cur, ast.Name):
-            parts.append(cur.id)
-            return tuple(reversed(parts)) == self.parts
-        return False
-
-@dataclass(frozen=True)
+            if i < 1 or cur.attr != parts[i]:
+                return False
+            i -= 1
+            cur = cur.value
+        return i == 0 and isinstance(cur, ast.Name) and cur.id == parts[0]
+
+@dataclass(frozen=True, slots=True)
 class KwPattern:
     items: Tuple[Tuple[str, ArgPattern], ...]
     mode: KW_MODE = KW_MODE.SUBSET
@@ -121,7 +133,7 @@ class KwPattern:
         if not isinstance(mode, KW_MODE):
             raise TypeError("KwPattern.mode must be a KW_MODE enum value.")
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CallSelector:
     """Match a call site structurally (AST-level), with deterministic handling of **kwargs.
 
@@ -147,6 +159,22 @@ class CallSelector:
         if not isinstance(starstar_policy, STARSTAR_POLICY):
             raise TypeError("starstar_policy must be a STARSTAR_POLICY enum value.")
 
+    def compile_match(self) -> Callable[..., bool]:
+        """Return this selector's predicate specialized into one closure.
+
+        Mode and policy branches are decided once here; the closure only does
+        the checks this selector actually needs. Predicates are cached per
+        selector value.
+        """
+        try:
+            return _MATCHERS[self]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable ArgConst value
+            return _compile_call_matcher(self)
+        fn = _MATCHERS[self] = _compile_call_matcher(self)
+        return fn
+
     def match(
         self,
         func_parts: Optional[Tuple[str, ...]],
@@ -155,44 +183,51 @@ class CallSelector:
         *,
         has_unresolved_starstar: bool = False,
     ) -> bool:
-        # func
-        if self.func is not None:
-            if func_parts != self.func.parts:
-                return False
-
-        # args
-        mode = self.args_mode
-        if mode == ARGS_MODE.EXACT:
-            if len(args_nodes) != len(self.args):
-                return False
-        if len(args_nodes) < len(self.args):
+        return self.compile_match()(func_parts, args_nodes, kwargs_nodes, has_unresolved_starstar)
+
+
+_MATCHERS: Dict[CallSelector, Callable[..., bool]] = {}
+
+def _compile_call_matcher(sel: CallSelector) -> Callable[..., bool]:
+    want_func = sel.func.parts if sel.func is not None else None
+    arg_preds = tuple(p.match for p in sel.args)
+    n_args = len(arg_preds)
+    exact_args = sel.args_mode == ARGS_MODE.EXACT
+    fail_starstar = sel.starstar_policy == STARSTAR_POLICY.FAIL
+    kw_pats = sel.kwargs.as_dict() if sel.kwargs is not None else None
+    kw_preds = tuple((k, p.match) for k, p in kw_pats.items()) if kw_pats is not None else ()
+    n_kw = len(kw_preds)
+    kw_exact = sel.kwargs is not None and sel.kwargs.mode == KW_MODE.EXACT
+    # Only SUBSET under ASSUME_MATCH lets unresolved **kwargs stand in for missing keys.
+    kw_assume = (sel.kwargs is not None and sel.kwargs.mode == KW_MODE.SUBSET
+                 and sel.starstar_policy == STARSTAR_POLICY.ASSUME_MATCH)
+
+    def match(func_parts, args_nodes, kwargs_nodes, has_unresolved_starstar=False) -> bool:
+        if want_func is not None and func_parts != want_func:
+            return False
+        n = len(args_nodes)
+        if n < n_args or (exact_args and n != n_args):
             return False
-        for pat, node in zip(self.args, args_nodes):
-            if not pat.match(node):
+        for pred, node in zip(arg_preds, args_nodes):
+            if not pred(node):
                 return False
-
-        # kwargs / **kwargs
-        starstar_policy = self.starstar_policy
-        if has_unresolved_starstar and starstar_policy == STARSTAR_POLICY.FAIL:
+        if has_unresolved_starstar and fail_starstar:
             return False
-
-        if self.kwargs is not None:
-            kwmode = self.kwargs.mode
-            pats = self.kwargs.as_dict()
-
-            missing = [k for k in pats.keys() if k not in kwargs_nodes]
-            if missing:
-                if has_unresolved_starstar and starstar_policy == STARSTAR_POLICY.ASSUME_MATCH and kwmode == KW_MODE.SUBSET:
-                    missing = []
-                else:
-                    return False
-
-            for k, pat in pats.items():
-                if k in kwargs_nodes and not pat.match(kwargs_nodes[k]):
+        if kw_pats is None:
+            return True
+        for k, pred in kw_preds:
+            node = kwargs_nodes.get(k, _MISSING)
+            if node is _MISSING:
+                if not (has_unresolved_starstar and kw_assume):
                     return False
+            elif not pred(node):
+                return False
+        # Every pattern key is present by now (EXACT never assumes), so equal
+        # sizes mean equal key sets.
+        if kw_exact and len(kwargs_nodes) != n_kw:
+            return False
+        return True
 
-            if kwmode == KW_MODE.EXACT:
-                if set(kwargs_nodes.keys()) != set(pats.keys()):
-                    return False
+    return match
 
-        return True
+_MISSING = object()
@@ -4,7 +4,7 @@ import warnings
 from typing import Any, Dict, List, Tuple, Optional
 from .model import TYPE, At, POLICY
 from .registry import REGISTRY, InjectorSpec
-from .handlers import get_handler
+from .handlers import GUARD_PREFIX, SiteNames, bind_site_names, get_handler, invalidate_index, site_guarded, site_key, SiteKey
 from .errors import MixinMatchError
 from .location_utils import apply_location
 
@@ -16,6 +16,10 @@ class MixinTransformer(ast.NodeTransformer):
     def __init__(self, module_name: str, debug: bool = False):
         self.module_name = module_name
         self.debug = debug
+        # site variable name -> injector-map key, bound once at module import
+        self._sites: Dict[str, SiteKey] = {}
+        self._guards: Dict[str, SiteKey] = {}
+        self._names = SiteNames()
         super().__init__()
 
     def _policy(self, spec: InjectorSpec) -> POLICY:
@@ -62,14 +66,33 @@ class MixinTransformer(ast.NodeTransformer):
 
     def _instrument_method(self, item: ast.FunctionDef, target: str) -> None:
         """Apply all registered injectors to a single method node (FunctionDef or AsyncFunctionDef)."""
-        injectors = REGISTRY.get_injectors(target, item.name)
+        # Injectors with an empty body are never woven (see InjectorSpec.noop).
+        injectors = [s for s in REGISTRY.get_injectors(target, item.name) if not s.noop]
         if not injectors:
             return
         # Group by At (type+name+selector+location) for batching
         by_at: Dict[At, List[InjectorSpec]] = {}
+        # Different At groups can share one injector site (same type + name);
+        # handlers get every spec that will run there.
+        by_site: Dict[SiteKey, List[InjectorSpec]] = {}
+        # The api helpers hand out one shared At per distinct location, so look
+        # groups up by identity first and hash the (deep) At once per instance.
+        by_at_id: Dict[int, Tuple[List[InjectorSpec], List[InjectorSpec]]] = {}
         for spec in injectors:
-            by_at.setdefault(spec.at, []).append(spec)
+            groups = by_at_id.get(id(spec.at))
+            if groups is None:
+                groups = by_at_id[id(spec.at)] = (
+                    by_at.setdefault(spec.at, []),
+                    by_site.setdefault(site_key(target, item.name, spec.at), []),
+                )
+            groups[0].append(spec)
+            groups[1].append(spec)
+        bind_site_names(item, self._names)
         for at, specs in by_at.items():
+            key = site_key(target, item.name, at)
+            self._sites[self._names.name(key)] = key
+            if site_guarded(by_site[key]):
+                self._guards[self._names.name(key, GUARD_PREFIX)] = key
             handler = get_handler(at.type)
             matches = apply_location(item, handler.find(item, at), at)
             # enforce require/expect for each spec (simple: same match count)
@@ -92,11 +115,20 @@ class MixinTransformer(ast.NodeTransformer):
                         target=target,
                         method=item.name,
                     )
-            handler.instrument(item, matches, specs, target)
+            handler.instrument(item, matches, by_site[key], target)
+            # the rewrite changed the tree; the next group re-indexes it
+            invalidate_index(item)
+        bind_site_names(item, None)
+        # Woven nodes only ever land inside this method, so locating them here
+        # saves a whole-module fix_missing_locations pass.
+        ast.fix_missing_locations(item)
 
     def visit_ClassDef(self, node: ast.ClassDef):
         # Determine fully qualified target for this class: module.ClassName
         target = f"{self.module_name}.{node.name}"
+        # Classes nothing targets are passed over without a lookup per method.
+        if target not in REGISTRY.target_prefixes():
+            return node
         # Apply injectors per method (sync and async)
         for item in node.body:
             if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
@@ -109,4 +141,34 @@ class MixinTransformer(ast.NodeTransformer):
             if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
                 self._instrument_method(item, self.module_name)
         self.generic_visit(node)
+        if self._sites:
+            node.body[self._prologue_index(node):0] = [ast.fix_missing_locations(b) for b in self._site_bindings()]
         return node
+
+    def _site_bindings(self) -> List[ast.stmt]:
+        # _mixin_inj_<...> = __mixin_injectors__.get(key, ())
+        # The map is filled by MixinLoader.exec_module before the body runs and is
+        # fixed once the registry is frozen, so woven code never hashes keys per call.
+        # _mixin_guard_<...> = __mixin_guards__.get(key)  (fast_guard sites only)
+        out: List[ast.stmt] = []
+        for mapping, sites, default in (("__mixin_injectors__", self._sites, ast.Tuple(elts=[], ctx=ast.Load())),
+                                        ("__mixin_guards__", self._guards, ast.Constant(value=None))):
+            for name, key in sites.items():
+                lookup = ast.Call(
+                    func=ast.Attribute(value=ast.Name(id=mapping, ctx=ast.Load()), attr="get", ctx=ast.Load()),
+                    args=[ast.Tuple(elts=[ast.Constant(value=k) for k in key], ctx=ast.Load()), default],
+                    keywords=[],
+                )
+                out.append(ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())], value=lookup))
+        return out
+
+    @staticmethod
+    def _prologue_index(node: ast.Module) -> int:
+        # Bindings go after the docstring and any ``from __future__`` imports.
+        idx = 0
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str):
+            idx = 1
+        while idx < len(body) and isinstance(body[idx], ast.ImportFrom) and body[idx].module == "__future__":
+            idx += 1
+        return idx
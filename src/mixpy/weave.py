@@ -2,15 +2,20 @@ from __future__ import annotations
 from typing import Any, Callable, Dict, List, Tuple
 
 from .registry import REGISTRY, InjectorSpec
-from .runtime import _eval_when
+from .handlers import site_guarded, site_key
+from .runtime import _compiled_when
 
-def build_injector_map(module_name: str) -> Dict[Tuple[str,str,str,str], List[Callable]]:
+def build_injector_map(module_name: str) -> Dict[Tuple[str,str,str,str], Tuple[Callable, ...]]:
     """Build mapping used by transformed modules.
 
-    key = (target, method, type_name, at_name_str) -> [callables...]
+    key = (target, method, type_name, at_name_str) -> (callables...)
     Only includes targets within the given module.
 
-    Note: we wrap callbacks to enforce per-injector Condition (When DSL) at runtime.
+    The registry keeps each (target, method) list in resolver order, so the
+    per-site tuples are already sorted and dispatch never re-sorts them.
+
+    Note: we wrap callbacks to enforce per-injector Condition (When DSL) at runtime;
+    equal conditions share one predicate, compiled when the injector was declared.
     """
     out: Dict[Tuple[str,str,str,str], List[Callable]] = {}
 
@@ -18,8 +23,9 @@ def build_injector_map(module_name: str) -> Dict[Tuple[str,str,str,str], List[Ca
         if not (target == module_name or target.startswith(module_name + ".")):
             continue
         for spec in specs:
-            canon_name = spec.at.name if spec.at.name is not None else spec.at.type.value
-            key = (target, method, spec.at.type.value, str(canon_name))
+            if spec.noop:
+                continue
+            key = site_key(target, method, spec.at)
 
             cond = spec.at.condition
             cb = spec.callback
@@ -28,8 +34,10 @@ def build_injector_map(module_name: str) -> Dict[Tuple[str,str,str,str], List[Ca
                 wrapped = cb
             else:
                 def _make_wrapper(cb, cond):
+                    pred = _compiled_when(cond)
                     def _wrapped(self_obj, ci, *args, **kwargs):
-                        if _eval_when(cond, ci.get_context()):
+                        # pred only reads the context, so hand it the dict itself
+                        if pred(ci._ctx or {}):
                             return cb(self_obj, ci, *args, **kwargs)
                         return None
                     _wrapped.__name__ = getattr(cb, "__name__", "wrapped_injector")
@@ -38,4 +46,30 @@ def build_injector_map(module_name: str) -> Dict[Tuple[str,str,str,str], List[Ca
                 wrapped = _make_wrapper(cb, cond)
 
             out.setdefault(key, []).append(wrapped)
+    return {key: tuple(cbs) for key, cbs in out.items()}
+
+
+def build_guard_map(module_name: str) -> Dict[Tuple[str,str,str,str], Callable[[Any], bool]]:
+    """Build the ``fast_guard`` mapping used by transformed modules.
+
+    Only sites where every injector supplies a guard get an entry; the woven
+    call skips dispatch when the combined guard returns True.
+    """
+    by_site: Dict[Tuple[str,str,str,str], List[InjectorSpec]] = {}
+    for (target, method), specs in REGISTRY.iter_injectors():  # type: ignore[attr-defined]
+        if not (target == module_name or target.startswith(module_name + ".")):
+            continue
+        for spec in specs:
+            if not spec.noop:
+                by_site.setdefault(site_key(target, method, spec.at), []).append(spec)
+
+    out: Dict[Tuple[str,str,str,str], Callable[[Any], bool]] = {}
+    for key, specs in by_site.items():
+        if not site_guarded(specs):
+            continue
+        guards = [s.fast_guard for s in specs]
+        if len(guards) == 1:
+            out[key] = guards[0]
+        else:
+            out[key] = lambda self_obj, guards=tuple(guards): all(g(self_obj) for g in guards)
     return out
@@ -1,6 +1,8 @@
 import sys
 import pathlib
 
+import pytest
+
 # Ensure src/ layout is on path for pytest invocation from repo folder
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
@@ -13,3 +15,11 @@ import demo_game.patches  # register patches
 import demo_game.network.patches  # register network patches
 
 mixpy.init()
+
+
+@pytest.fixture(scope="session")
+def stub_dir(tmp_path_factory):
+    """Stubs for the demo registry, generated once for the whole session."""
+    out = tmp_path_factory.mktemp("stubs")
+    mixpy.generate_stubs(output_dir=str(out))
+    return out
@@ -44,6 +44,8 @@ def test_inject_validates_method_and_at():
         api.inject(method="run", at="HEAD")
     with pytest.raises(TypeError, match="POLICY enum"):
         api.inject(method="run", at=api.at_head(), policy="ERROR")
+    with pytest.raises(ValueError, match="fast_guard"):
+        api.inject(method="run", at=api.at_head(), fast_guard=lambda self: True)
 
     @api.inject_head(method="tick", policy=POLICY.WARN)
     def _ok(self, ci):
@@ -65,6 +67,77 @@ def test_at_helpers_build_expected_types():
     assert Loc(occurrence=OCCURRENCE.FIRST).occurrence == OCCURRENCE.FIRST
 
 
+def test_at_helpers_share_identical_specs():
+    loc = Loc(ordinal=0)
+    assert api.at_invoke("self.fn", location=loc) is api.at_invoke("self.fn", location=Loc(ordinal=0))
+    assert api.at_const(1) is not api.at_const(1.0)
+    assert not hasattr(api.at_head(), "__dict__")
+
+
+def test_inject_keeps_conditions_on_same_named_classes_apart():
+    from mixpy.model import OP, When
+
+    def make():
+        class Target:
+            pass
+        return Target
+
+    first_cls, second_cls = make(), make()
+
+    def at(cls):
+        return api.At(type=TYPE.HEAD, location=Loc(condition=When("self", OP.ISINSTANCE, cls)))
+
+    @api.inject(method="tick", at=at(first_cls))
+    def first(self, ci):
+        return None
+
+    @api.inject(method="tick", at=at(second_cls))
+    def second(self, ci):
+        return None
+
+    assert first.__inject_spec__.at.location.condition.right is first_cls
+    assert second.__inject_spec__.at.location.condition.right is second_cls
+
+
+def test_inject_shares_descriptors_and_condition_predicates():
+    from mixpy.model import OP, When
+    from mixpy.runtime import _compiled_when
+
+    def at():
+        return api.At(type=TYPE.PARAMETER, name="body", location=Loc(condition=When("value", OP.EQ, "")))
+
+    @api.inject(method="post", at=at())
+    def first(self, ci):
+        return None
+
+    @api.inject(method="send", at=at())
+    def second(self, ci):
+        return None
+
+    assert first.__inject_spec__.at is second.__inject_spec__.at
+    assert _compiled_when(at().condition) is _compiled_when(first.__inject_spec__.at.condition)
+
+
+def test_inject_does_not_share_predicates_between_equal_but_distinct_operands():
+    from mixpy.model import OP, When
+    from mixpy.runtime import _eval_when
+
+    def at(value):
+        return api.At(type=TYPE.HEAD, location=Loc(condition=When("v", OP.MATCH, value)))
+
+    @api.inject(method="tick", at=at(1))
+    def by_int(self, ci):
+        return None
+
+    @api.inject(method="tick", at=at(True))
+    def by_bool(self, ci):
+        return None
+
+    assert by_int.__inject_spec__.at is not by_bool.__inject_spec__.at
+    assert _eval_when(by_bool.__inject_spec__.at.condition, {"v": "True"}) is True
+    assert _eval_when(by_int.__inject_spec__.at.condition, {"v": "True"}) is False
+
+
 def test_inject_shortcut_builders_attach_specs():
     @api.inject_head(method="tick")
     def head(self, ci):
@@ -79,6 +152,130 @@ def test_inject_shortcut_builders_attach_specs():
     assert param.__inject_spec__.at.name == "value"
 
 
+def test_inject_marks_callbacks_that_read_context():
+    @api.inject_head(method="tick")
+    def plain(self, ci):
+        ci.cancel(result=1)
+
+    @api.inject_head(method="tick")
+    def reader(self, ci):
+        if ci.get_context().get("self") is None:
+            ci.cancel()
+
+    @api.inject_head(method="tick")
+    def escapes(self, ci):
+        print(ci)
+
+    @api.inject_parameter(method="set_health", name="value")
+    def value_only(self, ci, value):
+        ci.set_value(max(0, ci.get_value()))
+
+    assert plain.__inject_spec__.uses_context is False
+    assert reader.__inject_spec__.uses_context is True
+    assert escapes.__inject_spec__.uses_context is True
+    assert reader.__inject_spec__.uses_locals is True
+    assert value_only.__inject_spec__.uses_context is True
+    assert value_only.__inject_spec__.uses_locals is False
+
+
+def test_inject_marks_cancel_and_value_capabilities():
+    @api.inject_parameter(method="set_health", name="value")
+    def clamp(self, ci, value):
+        ci.set_value(0)
+
+    @api.inject_head(method="tick")
+    def stop(self, ci):
+        ci.cancel()
+
+    assert clamp.__inject_spec__.may_set_value is True
+    assert clamp.__inject_spec__.may_cancel is False
+    assert stop.__inject_spec__.may_cancel is True
+    assert stop.__inject_spec__.may_set_value is False
+
+
+def test_inject_treats_frame_reading_callbacks_as_using_everything():
+    @api.inject_head(method="tick")
+    def via_locals(self, ci):
+        locals()["ci"].cancel()
+
+    @api.inject_parameter(method="set_health", name="value")
+    def via_eval(self, ci, value):
+        eval("ci.set_value(0)")
+
+    for spec in (via_locals.__inject_spec__, via_eval.__inject_spec__):
+        assert spec.uses_context is True
+        assert spec.may_cancel is True
+        assert spec.may_set_value is True
+
+
+def test_inject_treats_getframe_callbacks_as_using_everything():
+    import sys
+
+    @api.inject_head(method="tick")
+    def via_getframe(self, ci):
+        sys._getframe().f_locals["ci"].cancel()
+
+    spec = via_getframe.__inject_spec__
+    assert spec.uses_context is True
+    assert spec.may_cancel is True
+    assert spec.may_set_value is True
+
+
+def test_bound_method_callbacks_are_not_analysed():
+    from mixpy.introspect import may_cancel, may_set_value, uses_context
+
+    class Mixin:
+        def stop(self, self_obj, ci):
+            ci.cancel()
+
+    class Callback:
+        def __call__(self, self_obj, ci):
+            ci.cancel()
+
+    for cb in (Mixin().stop, Callback()):
+        assert may_cancel(cb) is True
+        assert may_set_value(cb) is True
+        assert uses_context(cb) is True
+
+
+def test_inject_classifies_literal_only_callbacks():
+    @api.inject_head(method="tick")
+    def stop(self, ci):
+        """Always bail out."""
+        ci.cancel(result=-1)
+
+    @api.inject_parameter(method="set_health", name="value")
+    def zero(self, ci, value):
+        ci.set_value(0)
+
+    @api.inject_parameter(method="set_health", name="value")
+    def computed(self, ci, value):
+        ci.set_value(value * 2)
+
+    assert stop.__inject_spec__.const_action == ("cancel", -1)
+    assert zero.__inject_spec__.const_action == ("set_value", 0)
+    assert computed.__inject_spec__.const_action is None
+
+
+def test_inject_marks_empty_callbacks_as_noop():
+    @api.inject_head(method="send")
+    def observe(self, ci, *args, **kw):
+        """Only here to show a HEAD hook."""
+        pass
+
+    @api.inject_head(method="send", require=1)
+    def counted(self, ci):
+        pass
+
+    @api.inject_head(method="send")
+    def stop(self, ci):
+        ci.cancel()
+
+    assert observe.__inject_spec__.noop is True
+    assert counted.__inject_spec__.noop is False
+    assert stop.__inject_spec__.noop is False
+
+
 def test_mixin_accepts_type_target_and_registers(monkeypatch):
     fake = _FakeRegistry()
     monkeypatch.setattr(api, "REGISTRY", fake)
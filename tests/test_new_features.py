@@ -114,7 +114,7 @@ def test_yield_injection_cancel_substitutes_value():
 def test_source_ejection_writes_to_configured_dir(tmp_path):
     import os
     import mixpy
-    from mixpy.debug import set_dump_dir, maybe_dump
+    from mixpy.debug import set_dump_dir, maybe_dump, flush_dumps
     import ast
 
     dump_dir = tmp_path / "weaved_out"
@@ -123,6 +123,7 @@ def test_source_ejection_writes_to_configured_dir(tmp_path):
     try:
         tree = ast.parse("x = 1\n")
         maybe_dump("test_module_dump", tree)
+        flush_dumps()
         out_file = dump_dir / "test_module_dump.py"
         assert out_file.exists(), "source ejection should write to the configured dir"
         assert "x = 1" in out_file.read_text()
@@ -134,7 +135,7 @@ def test_source_ejection_writes_to_configured_dir(tmp_path):
 def test_source_ejection_default_dir(tmp_path, monkeypatch):
     import os
     import mixpy
-    from mixpy.debug import set_dump_dir, maybe_dump
+    from mixpy.debug import set_dump_dir, maybe_dump, flush_dumps
     import ast
 
     # Temporarily cd to tmp_path so .weaved/ is created there
@@ -144,6 +145,7 @@ def test_source_ejection_default_dir(tmp_path, monkeypatch):
     try:
         tree = ast.parse("y = 2\n")
         maybe_dump("default_dir_test", tree)
+        flush_dumps()
         out_file = tmp_path / ".weaved" / "default_dir_test.py"
         assert out_file.exists(), "default dump dir should be .weaved/"
     finally:
@@ -154,7 +156,7 @@ def test_source_ejection_default_dir(tmp_path, monkeypatch):
 def test_configure_source_dump_dir(tmp_path):
     import os
     import mixpy
-    from mixpy.debug import set_dump_dir, maybe_dump
+    from mixpy.debug import set_dump_dir, maybe_dump, flush_dumps
     import ast
 
     mixpy.configure(source_dump_dir=str(tmp_path / "custom_weaved"))
@@ -162,6 +164,7 @@ def test_configure_source_dump_dir(tmp_path):
     try:
         tree = ast.parse("z = 3\n")
         maybe_dump("configure_test", tree)
+        flush_dumps()
         assert (tmp_path / "custom_weaved" / "configure_test.py").exists()
     finally:
         os.environ["MIXIN_DEBUG"] = "False"
@@ -214,20 +217,14 @@ def test_reload_target_re_imports_module():
 # 7. Type Hinting Generation (.pyi stubs)
 # ---------------------------------------------------------------------------
 
-def test_generate_stubs_creates_files(tmp_path):
-    import mixpy
-
-    mixpy.generate_stubs(output_dir=str(tmp_path))
-    stubs = list(tmp_path.glob("*.pyi"))
+def test_generate_stubs_creates_files(stub_dir):
+    stubs = list(stub_dir.glob("*.pyi"))
     assert len(stubs) > 0, "generate_stubs should create at least one .pyi file"
 
 
-def test_generate_stubs_content(tmp_path):
-    import mixpy
-
-    mixpy.generate_stubs(output_dir=str(tmp_path))
+def test_generate_stubs_content(stub_dir):
     # Find a stub that mentions Player-related injectors
-    contents = "".join(f.read_text() for f in tmp_path.glob("*.pyi"))
+    contents = "".join(f.read_text() for f in stub_dir.glob("*.pyi"))
     assert "mixin-injected" in contents, ".pyi stubs should contain mixin-injected markers"
     assert "def " in contents, ".pyi stubs should contain method stubs"
 
@@ -240,7 +237,7 @@ def test_bytecode_cache_is_created():
     """After importing the demo player, a bytecode cache should exist."""
     cache_dir = pathlib.Path("__pycache__") / "mixin_weaved"
     assert cache_dir.exists(), "bytecode cache directory should be created"
-    cached = list(cache_dir.glob("demo_game_game_player_player.*.pyc"))
+    cached = list(cache_dir.glob("demo_game-game-player-player.*.pyc"))
     assert len(cached) > 0, "at least one cached pyc should exist for the player module"
 
 
@@ -249,13 +246,23 @@ def test_bytecode_cache_is_valid_marshal():
     import marshal
 
     cache_dir = pathlib.Path("__pycache__") / "mixin_weaved"
-    cached = list(cache_dir.glob("demo_game_game_player_player.*.pyc"))
+    cached = list(cache_dir.glob("demo_game-game-player-player.*.pyc"))
     assert cached, "cache file should exist"
     with open(cached[0], "rb") as fh:
         code = marshal.loads(fh.read())
     assert hasattr(code, "co_filename"), "should deserialize to a code object"
 
 
+def test_bytecode_cache_is_keyed_by_interpreter_and_written_atomically():
+    import importlib.util
+
+    cache_dir = pathlib.Path("__pycache__") / "mixin_weaved"
+    cached = list(cache_dir.glob("demo_game-game-player-player.*.pyc"))
+    assert cached
+    assert all(importlib.util.MAGIC_NUMBER.hex() in f.name for f in cached)
+    assert not list(cache_dir.glob("*.tmp"))
+
+
 # ---------------------------------------------------------------------------
 # 9. Fast-Path Execution (behavioural correctness)
 # ---------------------------------------------------------------------------
@@ -278,6 +285,16 @@ def test_fast_path_does_not_alter_behaviour_when_no_injectors_apply():
     assert p.calculate_physics(5) == 10
 
 
+def test_fast_path_injector_lists_are_bound_once_per_module(monkeypatch):
+    """Woven modules resolve each injector site at import, not per call."""
+    import demo_game.utils as utils
+
+    key = ("demo_game.utils", "compute_bonus", "PARAMETER", "multiplier")
+    assert utils.compute_bonus(2, 50.0) == 20.0
+    monkeypatch.setitem(utils.__mixin_injectors__, key, ())
+    assert utils.compute_bonus(2, 50.0) == 20.0
+
+
 # ---------------------------------------------------------------------------
 # LineSpec unit test (independent of conftest weaving)
 # ---------------------------------------------------------------------------
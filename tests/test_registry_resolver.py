@@ -78,3 +78,64 @@ def test_mixin_list_target_registers_against_all_targets():
         assert not fresh.get_injectors("pkg.C", "tick")
     finally:
         api_mod.REGISTRY = original
+
+
+def test_target_prefixes_cover_enclosing_modules_and_track_changes():
+    registry = Registry()
+    cb = _cb("a")
+    registry.register_injector("pkg.mod.Player", InjectorSpec(mixin_cls=None, callback=cb, method="tick", at=At(type=TYPE.HEAD)))
+    assert {"pkg", "pkg.mod", "pkg.mod.Player"} <= registry.target_prefixes()
+    assert "pkg.other" not in registry.target_prefixes()
+
+    registry.register_class_member("pkg.other.Enemy", "extra", 1)
+    assert "pkg.other" in registry.target_prefixes()
+
+    registry.unregister_injector("pkg.mod.Player", "tick", cb)
+    assert "pkg.mod" not in registry.target_prefixes()
+
+
+def test_frozen_registry_serves_injector_snapshots():
+    registry = Registry()
+    registry.register_injector("pkg.A", InjectorSpec(mixin_cls=None, callback=_cb("a"), method="tick", at=At(type=TYPE.HEAD)))
+    registry.freeze()
+    first = registry.get_injectors("pkg.A", "tick")
+    assert first is registry.get_injectors("pkg.A", "tick")
+    assert registry.get_injectors("pkg.B", "tick") == ()
+
+    registry.unfreeze()
+    registry.register_injector("pkg.A", InjectorSpec(mixin_cls=None, callback=_cb("b"), method="tick", at=At(type=TYPE.HEAD)))
+    assert len(registry.get_injectors("pkg.A", "tick")) == 2
+
+
+def test_register_injector_interns_target_and_method():
+    import sys
+
+    registry = Registry()
+    target = "".join(["pkg.mod.", "Player"])
+    method = "".join(["up", "date"])
+    spec = InjectorSpec(mixin_cls=None, callback=_cb("a"), method=method, at=At(type=TYPE.HEAD))
+    registry.register_injector(target, spec)
+
+    (key, _specs), = registry.iter_injectors()
+    assert key[0] is sys.intern("pkg.mod.Player")
+    assert spec.method is sys.intern("update")
+
+
+def test_injector_fingerprints_are_reused_until_the_registry_changes(monkeypatch):
+    from mixpy import hook
+
+    registry = Registry()
+    monkeypatch.setattr(hook, "REGISTRY", registry)
+    cb = _cb("a")
+    registry.register_injector("pkg.mod.P", InjectorSpec(mixin_cls=None, callback=cb, method="tick", at=At(type=TYPE.HEAD)))
+    first = hook._injectors_fingerprint("pkg.mod")
+
+    monkeypatch.setattr(registry, "iter_injectors", lambda: (_ for _ in ()).throw(AssertionError("recomputed")))
+    assert hook._injectors_fingerprint("pkg.mod") == first
+    monkeypatch.undo()
+    monkeypatch.setattr(hook, "REGISTRY", registry)
+
+    version = registry.version()
+    registry.unregister_injector("pkg.mod.P", "tick", cb)
+    assert registry.version() > version
+    assert hook._injectors_fingerprint("pkg.mod") != first
@@ -52,6 +52,13 @@ def test_main_list_mode_does_not_bootstrap_runtime(monkeypatch, capsys):
     assert "Available scenarios:" in out
 
 
+def test_main_bare_list_skips_the_argument_parser(monkeypatch, capsys):
+    monkeypatch.setattr(run_demo, "_build_parser", lambda: (_ for _ in ()).throw(AssertionError("should not parse")))
+
+    assert run_demo.main(["--list"]) == 0
+    assert "Available scenarios:" in capsys.readouterr().out
+
+
 def test_main_returns_non_zero_when_any_check_fails(monkeypatch):
     monkeypatch.setattr(run_demo, "available_scenarios", lambda: [_scenario("fail", 1, 2)])
     monkeypatch.setattr(run_demo, "bootstrap_runtime", lambda: None)
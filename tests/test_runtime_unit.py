@@ -7,7 +7,9 @@ from mixpy.runtime import (
     CallbackInfo,
     _eval_when,
     _resolve_path,
+    compile_when,
     dispatch_injectors,
+    eval_const_site,
     eval_invoke,
     merge_kwargs,
 )
@@ -46,6 +48,47 @@ def test_eval_when_len_operators():
     assert not _eval_when(When("tags", OP.LEN_GT, 2), ctx)
 
 
+def test_compile_when_builds_reusable_predicate():
+    pred = compile_when(When.or_(When("kwargs.scale", OP.EQ, 7), When("args[0]", OP.IS_NONE)))
+
+    assert pred({"kwargs": {"scale": 7}, "args": [1]})
+    assert pred({"kwargs": {}, "args": [None]})
+    assert not pred({"kwargs": {"scale": 3}, "args": [1]})
+    assert not compile_when(When("bad path!", OP.NOT_NONE))({"x": 1})
+
+
+def test_compile_when_pairs_and_bare_keys_behave_like_the_general_path():
+    pred = compile_when(When.and_(When("value", OP.GT, 1), When("value", OP.LT, 5)))
+
+    assert pred({"value": 3}) is True
+    assert pred({"value": 7}) is False
+    assert compile_when(When("value", OP.IS_NONE))({"args": [1]})
+    assert compile_when(When("kwargs.scale", OP.EQ, 2))({"kwargs.scale": 2})
+
+
+def test_compiled_when_evaluates_trees_and_caches_unhashable_conditions():
+    from mixpy.runtime import _compiled_when
+
+    cond = When.and_(When("x", OP.IN, [1, 2]), When.not_(When("name", OP.MATCH, "npc")), When("tags", OP.LEN_GT, 0))
+    pred = _compiled_when(cond)
+
+    assert pred({"x": 2, "name": "player", "tags": ["a"]}) is True
+    assert pred({"x": 3, "name": "player", "tags": ["a"]}) is False
+    assert pred({"x": 1, "name": "npc_guard", "tags": ["a"]}) is False
+    assert pred({"x": 1, "name": "player", "tags": []}) is False
+    assert _compiled_when(cond) is pred
+    assert compile_when(When.and_())({}) is True and compile_when(When.or_())({}) is False
+
+
+def test_compiled_when_keeps_equal_but_distinct_operands_apart():
+    from mixpy.runtime import _compiled_when
+
+    assert _compiled_when(When("v", OP.MATCH, 1))({"v": "1"}) is True
+    assert _compiled_when(When("v", OP.MATCH, True))({"v": "True"}) is True
+    assert _compiled_when(When("v", OP.MATCH, 1))({"v": "True"}) is False
+    assert _compiled_when(When("v", OP.MATCH, 1.0))({"v": "1.0"}) is True
+
+
 def test_merge_kwargs_raises_on_duplicate_keys():
     with pytest.raises(TypeError, match="multiple values for keyword argument 'scale'"):
         merge_kwargs({"scale": 2}, {"scale": 3})
@@ -75,6 +118,13 @@ def test_callbackinfo_call_original_raises_when_missing():
         ci.call_original()
 
 
+def test_callbackinfo_uses_slots():
+    ci = CallbackInfo(type=TYPE.HEAD, target="t", method="m", at_name=None, trace_id=1)
+    assert not hasattr(ci, "__dict__")
+    with pytest.raises(AttributeError):
+        ci.extra = 1
+
+
 def test_callbackinfo_parameter_helpers_map_to_value_mutation():
     ci = CallbackInfo(type=TYPE.PARAMETER, target="t", method="set_health", at_name="value", trace_id="p1")
     ci._ctx = {"param": "value", "value": -5}
@@ -86,6 +136,70 @@ def test_callbackinfo_parameter_helpers_map_to_value_mutation():
     assert ci.new_value == 0
 
 
+def test_eval_const_site_uses_bound_injector_list():
+    def boost(self_obj, ci):
+        ci.set_value(ci.get_value() * 2)
+
+    assert eval_const_site([boost], "pkg.Player", "speed", "1.5", object(), 1.5) == 3.0
+    assert eval_const_site((), "pkg.Player", "speed", "1.5", object(), 1.5) == 1.5
+
+
+def test_runtime_sites_draw_trace_ids_from_shared_counter():
+    seen = []
+
+    def record(self_obj, ci):
+        seen.append(ci.trace_id)
+
+    eval_const_site([record], "pkg.Player", "speed", "1.5", object(), 1.5)
+    eval_const_site([record], "pkg.Player", "speed", "1.5", object(), 1.5)
+    assert all(isinstance(t, int) for t in seen)
+    assert seen[1] > seen[0]
+
+
+def test_dispatch_context_is_fresh_and_isolated_from_callback_args():
+    site_ctx = {"value": 1}
+    seen = []
+
+    def first(self_obj, ci, x, scale=1):
+        ci._ctx["args"].append("leak")
+        ci._ctx["kwargs"]["scale"] = 99
+
+    def second(self_obj, ci, x, scale=1):
+        seen.append((x, scale, ci.get_context()["value"]))
+
+    ci = CallbackInfo(type=TYPE.HEAD, target="pkg.P", method="f", at_name="HEAD", trace_id=1)
+    dispatch_injectors([first, second], ci, site_ctx, object(), 5, scale=2)
+
+    assert site_ctx == {"value": 1}
+    assert seen == [(5, 2, 1)]
+
+
+def test_get_context_is_a_live_read_only_view():
+    views = []
+
+    def cb(self_obj, ci, x):
+        views.append(ci.get_context())
+        ci.set_call_args(7)
+
+    ci = CallbackInfo(type=TYPE.INVOKE, target="pkg.P", method="f", at_name="g", trace_id=1)
+    ci._call_original, ci._call_args, ci._call_kwargs = (lambda x: x), [3], {}
+    dispatch_injectors([cb], ci, {}, object(), 3)
+
+    assert views[0]["args"] == [7]
+    with pytest.raises(TypeError):
+        views[0]["args"] = []
+    assert dict(CallbackInfo(type=TYPE.HEAD, target="pkg.P", method="f", at_name="HEAD", trace_id=2).get_context()) == {}
+
+
+def test_empty_sites_pass_values_through_without_dispatch(monkeypatch):
+    from mixpy import runtime
+
+    monkeypatch.setattr(runtime, "CallbackInfo", None)  # constructing one would fail
+    assert runtime.eval_const_site((), "pkg.P", "f", "1", None, 1) == 1
+    assert runtime.eval_attr_write_site((), "pkg.P", "f", "self.hp", None, 5) == 5
+    assert runtime.eval_invoke_site((), "pkg.P", "f", "g", None, lambda a, k=0: a + k, [1], {"k": 2}) == 3
+
+
 def test_eval_invoke_supports_overriding_call_args():
     seen = []
 
@@ -166,8 +280,14 @@ def test_eval_invoke_updated_args_flow_to_later_injectors():
     assert seen_second == [(10, 20)]
 
 def test_dispatch_injectors_trace_mode_logs_to_stderr(capsys, monkeypatch):
+    from mixpy import debug, runtime
+
+    monkeypatch.setattr(runtime, "_TRACE_ENABLED", runtime._TRACE_ENABLED)
+    monkeypatch.setattr(debug, "_CURRENT_LEVEL", debug._CURRENT_LEVEL)
     monkeypatch.setenv("MIXIN_TRACE", "True")
     monkeypatch.setenv("MIXPY_LOG_LEVEL", "DEBUG")
+    runtime.refresh_trace_flag()
+    debug.reconfigure_logging()
 
     def cb(self_obj, ci, value):
         ci.cancel(result=42)
@@ -179,3 +299,43 @@ def test_dispatch_injectors_trace_mode_logs_to_stderr(capsys, monkeypatch):
     assert "[mixpy:DEBUG]" in captured.err
     assert "pkg.Player" in captured.err
     assert "cancelled" in captured.err
+
+
+def test_log_settings_are_read_once_until_reconfigured(capsys, monkeypatch):
+    import io
+
+    from mixpy import debug
+
+    monkeypatch.setattr(debug, "_CURRENT_LEVEL", debug._CURRENT_LEVEL)
+    monkeypatch.setattr(debug, "_COLOUR_ENABLED", debug._COLOUR_ENABLED)
+    monkeypatch.setenv("MIXPY_LOG_LEVEL", "ERROR")
+    monkeypatch.setenv("FORCE_COLOR", "1")
+    debug.reconfigure_logging()
+
+    monkeypatch.setenv("MIXPY_LOG_LEVEL", "DEBUG")
+    out = io.StringIO()
+    debug.log("INFO", "hidden", stream=out)
+    assert out.getvalue() == ""
+
+    debug.reconfigure_logging()
+    debug.log("INFO", "shown", stream=out)
+    assert "shown" in out.getvalue() and "\033[" in out.getvalue()
+
+
+def test_trace_lines_are_not_formatted_below_debug_level(capsys, monkeypatch):
+    from mixpy import debug
+
+    monkeypatch.setattr(debug, "_CURRENT_LEVEL", debug._LEVELS["WARN"])
+    monkeypatch.setattr(debug, "_c", None)  # formatting would fail
+    debug.log_trace("pkg.P", "f", "HEAD", "HEAD", "cb", 1)
+    debug.log_cancel(None)
+    assert capsys.readouterr().err == ""
+
+
+def test_trace_counter_yields_increasing_ints():
+    from mixpy import runtime
+
+    first = runtime._TRACE_COUNTER()
+    second = runtime._TRACE_COUNTER()
+    assert isinstance(first, int)
+    assert second > first
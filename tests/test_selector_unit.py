@@ -1,4 +1,5 @@
 import ast
+from functools import lru_cache
 
 import pytest
 
@@ -16,7 +17,9 @@ from mixpy.selector import (
 )
 
 
+@lru_cache(maxsize=None)
 def parse_expr(src: str) -> ast.AST:
+    # selectors only read the nodes, so repeated sources share one parse
     return ast.parse(src, mode="eval").body
 
 
@@ -45,58 +48,79 @@ def test_callselector_exact_args_mode_requires_same_arity():
     )
 
 
-def test_callselector_fail_policy_rejects_unresolved_starstar_kwargs():
+@pytest.mark.parametrize(
+    ("kw_pattern", "policy", "call_kwargs", "expected"),
+    [
+        # FAIL rejects a call whose ** could not be resolved, even if the known keys match
+        (KwPattern.subset, STARSTAR_POLICY.FAIL, {"scale": "3"}, False),
+        # ASSUME_MATCH lets the unknown ** supply a missing SUBSET kwarg
+        (KwPattern.subset, STARSTAR_POLICY.ASSUME_MATCH, {}, True),
+        # EXACT still checks the keys that are known
+        (KwPattern.exact, STARSTAR_POLICY.ASSUME_MATCH, {"scale": "3"}, True),
+    ],
+    ids=["fail-rejects", "assume-match-subset", "assume-match-exact-known-keys"],
+)
+def test_callselector_starstar_policy_with_unresolved_kwargs(kw_pattern, policy, call_kwargs, expected):
     selector = CallSelector(
         func=QualifiedSelector.of("self", "run"),
         args=(ArgAny(),),
-        kwargs=KwPattern.subset(scale=ArgConst(3)),
-        starstar_policy=STARSTAR_POLICY.FAIL,
+        kwargs=kw_pattern(scale=ArgConst(3)),
+        starstar_policy=policy,
     )
 
-    assert not selector.match(
+    assert selector.match(
         ("self", "run"),
         [parse_expr("x")],
-        {"scale": parse_expr("3")},
+        {k: parse_expr(v) for k, v in call_kwargs.items()},
         has_unresolved_starstar=True,
-    )
+    ) is expected
 
 
-def test_callselector_assume_match_allows_missing_subset_kwarg_with_unknown_starstar():
-    selector = CallSelector(
-        func=QualifiedSelector.of("self", "run"),
-        args=(ArgAny(),),
-        kwargs=KwPattern.subset(scale=ArgConst(3)),
-        starstar_policy=STARSTAR_POLICY.ASSUME_MATCH,
-    )
+@pytest.mark.parametrize(
+    ("build", "enum_name"),
+    [
+        (lambda: CallSelector(args_mode="EXACT"), "ARGS_MODE"),
+        (lambda: CallSelector(starstar_policy="FAIL"), "STARSTAR_POLICY"),
+        (lambda: KwPattern(items=(("scale", ArgConst(3)),), mode="SUBSET"), "KW_MODE"),
+    ],
+    ids=["args_mode", "starstar_policy", "kw_mode"],
+)
+def test_selector_choices_require_enums_not_strings(build, enum_name):
+    with pytest.raises(TypeError, match=enum_name):
+        build()
 
-    assert selector.match(
-        ("self", "run"),
-        [parse_expr("x")],
-        {},
-        has_unresolved_starstar=True,
-    )
 
+def test_callselector_compiled_predicate_is_shared_per_selector_value():
+    selector = CallSelector(func=QualifiedSelector.of("self", "run"), args=(ArgConst(1),))
+    twin = CallSelector(func=QualifiedSelector.of("self", "run"), args=(ArgConst(1),))
+    matcher = selector.compile_match()
 
-def test_callselector_exact_kwargs_uses_known_keys_when_starstar_unresolved():
-    selector = CallSelector(
-        func=QualifiedSelector.of("self", "run"),
-        args=(ArgAny(),),
-        kwargs=KwPattern.exact(scale=ArgConst(3)),
-        starstar_policy=STARSTAR_POLICY.ASSUME_MATCH,
-    )
+    assert twin.compile_match() is matcher
+    assert matcher(("self", "run"), [parse_expr("1")], {})
+    assert not matcher(("self", "go"), [parse_expr("1")], {})
 
-    assert selector.match(
-        ("self", "run"),
-        [parse_expr("x")],
-        {"scale": parse_expr("3")},
-        has_unresolved_starstar=True,
-    )
+    unhashable = CallSelector(args=(ArgConst([1]),))
+    assert not unhashable.match(None, [parse_expr("1")], {})
+
+
+def test_callselector_exact_kwargs_rejects_extra_known_keys():
+    selector = CallSelector(kwargs=KwPattern.exact(scale=ArgConst(3)))
+
+    assert selector.match(None, [], {"scale": parse_expr("3")})
+    assert not selector.match(None, [], {"scale": parse_expr("3"), "mode": parse_expr("1")})
+    assert not selector.match(None, [], {"mode": parse_expr("3")})
+
+
+def test_argattr_rejects_longer_shorter_and_non_name_roots():
+    pat = ArgAttr.of("self", "health")
+    assert not pat.match(parse_expr("self.player.health"))
+    assert not pat.match(parse_expr("health"))
+    assert not pat.match(parse_expr("f().health"))
+    assert not ArgAttr(parts=()).match(parse_expr("x"))
 
 
-def test_selector_choices_require_enums_not_strings():
-    with pytest.raises(TypeError, match="ARGS_MODE"):
-        CallSelector(args_mode="EXACT")
-    with pytest.raises(TypeError, match="STARSTAR_POLICY"):
-        CallSelector(starstar_policy="FAIL")
-    with pytest.raises(TypeError, match="KW_MODE"):
-        KwPattern(items=(("scale", ArgConst(3)),), mode="SUBSET")
+def test_selector_builders_share_instances():
+    assert QualifiedSelector.of("self", "log", "append") is QualifiedSelector.of("self", "log", "append")
+    assert ArgAttr.of("self", "hp") is ArgAttr.of("self", "hp")
+    assert ArgAny() is ArgAny()
+    assert QualifiedSelector.of("self", "log") == QualifiedSelector(parts=("self", "log"))
@@ -1,16 +1,23 @@
 from mixpy.model import At, Loc, OP, TYPE, When
 from mixpy.registry import InjectorSpec
 from mixpy.runtime import CallbackInfo
-from mixpy.weave import build_injector_map
+from mixpy import weave
+from mixpy.weave import build_guard_map, build_injector_map
+
+
+class _FakeRegistry:
+    def __init__(self, injectors):
+        self._injectors = injectors
+
+    def iter_injectors(self):
+        return iter(self._injectors.items())
+
+    def version(self):
+        return 0
 
 
 def _fake_registry(injectors_dict):
-    class FakeRegistry:
-        def __init__(self, d):
-            self._injectors = d
-        def iter_injectors(self):
-            yield from self._injectors.items()
-    return FakeRegistry(injectors_dict)
+    return _FakeRegistry(injectors_dict)
 
 
 def test_build_injector_map_filters_to_requested_module(monkeypatch):
@@ -27,7 +34,7 @@ def test_build_injector_map_filters_to_requested_module(monkeypatch):
         ("demo_game.utils", "compute"): [spec_mod],  # module-level function target
     })
 
-    monkeypatch.setattr("mixpy.weave.REGISTRY", fake_registry)
+    monkeypatch.setattr(weave, "REGISTRY", fake_registry)
 
     inj_map = build_injector_map("demo_game")
 
@@ -35,6 +42,8 @@ def test_build_injector_map_filters_to_requested_module(monkeypatch):
     assert ("other_game.player.Player", "tick", "HEAD", "HEAD") not in inj_map
     # module-level target (target == module_name) must be included
     assert ("demo_game.utils", "compute", "PARAMETER", "x") in inj_map
+    # frozen per-site sequences
+    assert inj_map[("demo_game.player.Player", "tick", "HEAD", "HEAD")] == (cb,)
 
 
 def test_build_injector_map_wraps_condition_and_preserves_callback_name(monkeypatch):
@@ -47,7 +56,7 @@ def test_build_injector_map_wraps_condition_and_preserves_callback_name(monkeypa
     spec = InjectorSpec(mixin_cls=object, callback=conditional_cb, method="set_value", at=at)
     fake_registry = _fake_registry({("demo_game.player.Player", "set_value"): [spec]})
 
-    monkeypatch.setattr("mixpy.weave.REGISTRY", fake_registry)
+    monkeypatch.setattr(weave, "REGISTRY", fake_registry)
 
     inj_map = build_injector_map("demo_game")
     wrapped = inj_map[("demo_game.player.Player", "set_value", "PARAMETER", "value")][0]
@@ -55,9 +64,449 @@ def test_build_injector_map_wraps_condition_and_preserves_callback_name(monkeypa
     assert wrapped.__name__ == conditional_cb.__name__
 
     ci = CallbackInfo(type=TYPE.PARAMETER, target="demo_game.player.Player", method="set_value", at_name="value", trace_id="t")
-    ci._ctx = {"value": 5}
-    wrapped(None, ci, 5)
-    ci._ctx = {"value": -1}
-    wrapped(None, ci, -1)
+    ci._ctx = ctx = {"value": 0}
+    for value in (5, -1):
+        ctx["value"] = value
+        wrapped(None, ci, value)
 
     assert calls == [5]
+
+
+def test_build_guard_map_requires_every_injector_at_site_to_have_a_guard(monkeypatch):
+    def cb(self_obj, ci, *args):
+        return None
+
+    at = At(type=TYPE.INVOKE, name="self.step")
+    guarded = InjectorSpec(mixin_cls=object, callback=cb, method="tick", at=at, fast_guard=lambda s: s is None)
+    unguarded = InjectorSpec(mixin_cls=object, callback=cb, method="tock", at=at)
+    fake_registry = _fake_registry({
+        ("demo_game.player.Player", "tick"): [guarded],
+        ("demo_game.player.Player", "tock"): [guarded, unguarded],
+    })
+
+    monkeypatch.setattr(weave, "REGISTRY", fake_registry)
+
+    guards = build_guard_map("demo_game")
+
+    assert guards[("demo_game.player.Player", "tick", "INVOKE", "self.step")](None) is True
+    assert ("demo_game.player.Player", "tock", "INVOKE", "self.step") not in guards
+
+
+def test_apply_location_anchor_offsets_pick_neighbours_of_anchor():
+    import ast
+
+    from mixpy.builtin_handlers import install_builtin_handlers
+    from mixpy.handlers import get_handler
+    from mixpy.location import AnchorSpec, SliceSpec
+    from mixpy.location_utils import apply_location
+
+    install_builtin_handlers()
+    fn = ast.parse(
+        "def f(self):\n"
+        "    a = self.step(1)\n"
+        "    b = self.mark()\n"
+        "    c = self.step(2)\n"
+        "    d = self.step(3)\n"
+    ).body[0]
+    mark = At(type=TYPE.INVOKE, name="self.mark")
+
+    def picked(loc):
+        at = At(type=TYPE.INVOKE, name="self.step", location=loc)
+        matches = get_handler(TYPE.INVOKE).find(fn, at)
+        return [m.node.args[0].value for m in apply_location(fn, matches, at)]
+
+    assert picked(Loc(anchor=AnchorSpec(anchor=mark, offset=0))) == [2]
+    assert picked(Loc(anchor=AnchorSpec(anchor=mark, offset=1))) == [3]
+    assert picked(Loc(anchor=AnchorSpec(anchor=mark, offset=-1))) == [1]
+    assert picked(Loc(anchor=AnchorSpec(anchor=mark, offset=-2))) == []
+    assert picked(Loc(slice=SliceSpec(from_anchor=mark))) == [2, 3]
+    assert picked(Loc(slice=SliceSpec(to_anchor=mark))) == [1]
+    missing = At(type=TYPE.INVOKE, name="self.nowhere")
+    assert picked(Loc(slice=SliceSpec(from_anchor=missing))) == []
+    assert picked(Loc(slice=SliceSpec(from_anchor=missing, to_anchor=mark))) == [1]
+
+
+def test_injectors_fingerprint_only_tracks_targets_in_module(monkeypatch):
+    from mixpy.hook import _injectors_fingerprint
+
+    def cb(self_obj, ci):
+        return None
+
+    spec = InjectorSpec(mixin_cls=object, callback=cb, method="tick", at=At(type=TYPE.HEAD))
+    monkeypatch.setattr("mixpy.hook.REGISTRY", _fake_registry({("pkg.a.Player", "tick"): [spec]}))
+    before_a, before_b = _injectors_fingerprint("pkg.a"), _injectors_fingerprint("pkg.b")
+
+    monkeypatch.setattr("mixpy.hook.REGISTRY", _fake_registry({
+        ("pkg.a.Player", "tick"): [spec],
+        ("pkg.b.Enemy", "tick"): [spec],
+    }))
+    assert _injectors_fingerprint("pkg.a") == before_a
+    assert _injectors_fingerprint("pkg.b") != before_b
+
+
+def test_loader_compiles_untargeted_modules_without_weaving(monkeypatch, tmp_path):
+    from mixpy.hook import MixinLoader
+
+    def boom(*args, **kwargs):
+        raise AssertionError("untargeted module should not be woven")
+
+    src = tmp_path / "plain.py"
+    src.write_text("VALUE = 1\n")
+    monkeypatch.setattr("mixpy.hook.REGISTRY", _fake_registry({("pkg.a.Player", "tick"): []}))
+    monkeypatch.setattr("mixpy.hook.MixinTransformer", boom)
+    monkeypatch.delenv("MIXIN_DEBUG", raising=False)
+    code = MixinLoader("plain", str(src)).source_to_code(src.read_bytes(), str(src))
+    ns = {}
+    exec(code, ns)
+    assert ns["VALUE"] == 1
+
+
+def test_loader_cache_is_keyed_by_source_stat_and_prunes_old_versions(monkeypatch, tmp_path):
+    import os
+
+    from mixpy.hook import MixinLoader
+
+    monkeypatch.setattr("mixpy.hook.REGISTRY", _fake_registry({}))
+    monkeypatch.setattr(MixinLoader, "_CACHE_DIR", tmp_path / "cache")
+    src = tmp_path / "plain.py"
+    src.write_text("VALUE = 1\n")
+    loader = MixinLoader("plain", str(src))
+
+    ns = {}
+    exec(loader.get_code("plain"), ns)
+    first = list((tmp_path / "cache").glob("plain.*.pyc"))
+    assert ns["VALUE"] == 1 and len(first) == 1
+
+    src.write_text("VALUE = 22\n")
+    os.utime(src, ns=(1, 1))
+    ns = {}
+    exec(loader.get_code("plain"), ns)
+    second = list((tmp_path / "cache").glob("plain.*.pyc"))
+    assert ns["VALUE"] == 22
+    assert len(second) == 1 and second != first
+
+
+def test_loader_cache_keeps_modules_with_similar_names_apart(monkeypatch, tmp_path):
+    from mixpy.hook import MixinLoader
+
+    monkeypatch.setattr("mixpy.hook.REGISTRY", _fake_registry({}))
+    monkeypatch.setattr(MixinLoader, "_CACHE_DIR", tmp_path / "cache")
+    dotted = tmp_path / "dotted.py"
+    dotted.write_text("VALUE = 1\n")
+    flat = tmp_path / "flat.py"
+    flat.write_text("VALUE = 2\n")
+
+    MixinLoader("a.b", str(dotted)).get_code("a.b")
+    MixinLoader("a_b", str(flat)).get_code("a_b")
+    assert len(list((tmp_path / "cache").glob("*.pyc"))) == 2
+
+    monkeypatch.setattr("mixpy.hook._CODE_CACHE", {})
+    for name, path, value in (("a.b", dotted, 1), ("a_b", flat, 2)):
+        ns = {}
+        exec(MixinLoader(name, str(path)).get_code(name), ns)
+        assert ns["VALUE"] == value
+
+
+def test_loader_cache_is_invalidated_by_a_selector_change(monkeypatch, tmp_path):
+    from mixpy.bootstrap import ensure_module_globals
+    from mixpy.hook import MixinLoader
+    from mixpy.registry import Registry
+    from mixpy.selector import ArgConst, CallSelector
+
+    def hit(self_obj, ci, *args):
+        ci.cancel(result="hit")
+
+    monkeypatch.setattr(MixinLoader, "_CACHE_DIR", tmp_path / "cache")
+    src = tmp_path / "selmod.py"
+    src.write_text("class P:\n    def fn(self, x):\n        return x\n    def run(self):\n        return [self.fn(1), self.fn(2)]\n")
+
+    def run_with(value):
+        registry = Registry()
+        at = At(type=TYPE.INVOKE, name="self.fn", selector=CallSelector(args=(ArgConst(value),)))
+        registry.register_injector("selmod.P", InjectorSpec(mixin_cls=object, callback=hit, method="run", at=at))
+        for name in ("mixpy.hook.REGISTRY", "mixpy.transformer.REGISTRY", "mixpy.weave.REGISTRY"):
+            monkeypatch.setattr(name, registry)
+        ns = {"__name__": "selmod"}
+        ensure_module_globals(ns)
+        ns["__mixin_injectors__"].update(build_injector_map("selmod"))
+        exec(MixinLoader("selmod", str(src)).get_code("selmod"), ns)
+        return ns["P"]().run()
+
+    assert run_with(1) == ["hit", 2]
+    assert run_with(2) == [1, "hit"]
+
+
+def test_loader_reuses_code_for_unchanged_sources_without_disk_reads(monkeypatch, tmp_path):
+    import shutil
+
+    from mixpy.hook import MixinLoader
+
+    monkeypatch.setattr("mixpy.hook.REGISTRY", _fake_registry({}))
+    monkeypatch.setattr(MixinLoader, "_CACHE_DIR", tmp_path / "cache")
+    src = tmp_path / "again.py"
+    src.write_text("VALUE = 3\n")
+    loader = MixinLoader("again", str(src))
+
+    first = loader.get_code("again")
+    shutil.rmtree(tmp_path / "cache")
+    assert loader.get_code("again") is first
+    assert not (tmp_path / "cache").exists()
+
+
+def test_transformer_skips_classes_without_injectors(monkeypatch):
+    import ast
+
+    from mixpy.registry import Registry
+    from mixpy.transformer import MixinTransformer
+
+    def cb(self_obj, ci):
+        ci.cancel()
+
+    registry = Registry()
+    registry.register_injector("pkg.mod.Hit", InjectorSpec(mixin_cls=object, callback=cb, method="run", at=At(type=TYPE.HEAD)))
+    looked_up = []
+    real_get = registry.get_injectors
+    monkeypatch.setattr(registry, "get_injectors", lambda t, m: looked_up.append(t) or real_get(t, m))
+    monkeypatch.setattr("mixpy.transformer.REGISTRY", registry)
+
+    tree = ast.parse("class Hit:\n    def run(self): pass\nclass Miss:\n    def run(self): pass\n    def walk(self): pass\n")
+    MixinTransformer("pkg.mod").visit(tree)
+    assert looked_up == ["pkg.mod.Hit"]
+
+
+def test_sites_whose_variable_names_collide_keep_their_own_injectors(monkeypatch):
+    import ast
+
+    from mixpy.bootstrap import ensure_module_globals
+    from mixpy.registry import Registry
+    from mixpy.transformer import MixinTransformer
+
+    def cancel_with(result):
+        def cb(self_obj, ci):
+            ci.cancel(result=result)
+        return cb
+
+    registry = Registry()
+    for method, result in (("run", "ran"), ("walk", "walked")):
+        registry.register_injector("pkg.mod.Hit", InjectorSpec(mixin_cls=object, callback=cancel_with(result), method=method, at=At(type=TYPE.HEAD)))
+    monkeypatch.setattr("mixpy.transformer.REGISTRY", registry)
+    monkeypatch.setattr(weave, "REGISTRY", registry)
+    monkeypatch.setattr("mixpy.handlers.site_var", lambda key, prefix="_mixin_inj": f"{prefix}_site")
+
+    tree = MixinTransformer("pkg.mod").visit(ast.parse("class Hit:\n    def run(self): pass\n    def walk(self): pass\n"))
+    ns = {"__name__": "pkg.mod"}
+    ensure_module_globals(ns)
+    ns["__mixin_injectors__"].update(build_injector_map("pkg.mod"))
+    exec(compile(ast.fix_missing_locations(tree), "<woven>", "exec"), ns)
+
+    hit = ns["Hit"]()
+    assert (hit.run(), hit.walk()) == ("ran", "walked")
+
+
+def test_install_builtin_handlers_reuses_one_instance_per_type():
+    from mixpy.builtin_handlers import install_builtin_handlers
+    from mixpy.handlers import get_handler
+
+    install_builtin_handlers()
+    first = [get_handler(t) for t in TYPE]
+    install_builtin_handlers()
+    assert all(a is b for a, b in zip(first, (get_handler(t) for t in TYPE)))
+
+
+def _weave_function(src, spec, target="pkg.mod"):
+    """Instrument the single function in ``src`` for ``spec`` and return it."""
+    import ast
+
+    from mixpy.bootstrap import ensure_module_globals
+    from mixpy.builtin_handlers import install_builtin_handlers
+    from mixpy.handlers import get_handler, site_key, site_var
+
+    install_builtin_handlers()
+    fn = ast.parse(src).body[0]
+    handler = get_handler(spec.at.type)
+    handler.instrument(fn, handler.find(fn, spec.at), [spec], target)
+    module = ast.fix_missing_locations(ast.Module(body=[fn], type_ignores=[]))
+    ns = {site_var(site_key(target, spec.method, spec.at)): (spec.callback,)}
+    ensure_module_globals(ns)
+    exec(compile(module, "<woven>", "exec"), ns)
+    return ns[fn.name]
+
+
+def test_yield_sites_call_the_evaluator_through_a_module_global():
+    def times_ten(self_obj, ci, *args):
+        ci.set_value(ci.get_value() * 10)
+
+    spec = InjectorSpec(mixin_cls=object, callback=times_ten, method="f", at=At(type=TYPE.YIELD))
+    f = _weave_function("def f(self):\n    yield 1\n    yield 2\n", spec)
+
+    assert list(f(None)) == [10, 20]
+    # the woven yield needs only the evaluator global, not the runtime module
+    del f.__globals__["mixpy_runtime"]
+    assert list(f(None)) == [10, 20]
+    f.__globals__["__mixin_eval_yield__"] = lambda injectors, target, method, at_name, self_obj, value: -value
+    assert list(f(None)) == [-1, -2]
+
+
+def test_tail_evaluates_return_expression_once_and_exposes_it_on_ci():
+    seen = []
+
+    def cb(self_obj, ci, *args):
+        seen.append(ci.return_value)
+        ci.set_return_value(ci.current_return_value() + 1)
+
+    spec = InjectorSpec(mixin_cls=object, callback=cb, method="f", at=At(type=TYPE.TAIL))
+    f = _weave_function("def f(self, calls):\n    return calls.append(1) or len(calls)\n", spec)
+
+    calls = []
+    assert f(None, calls) == 2
+    assert calls == [1]
+    assert seen == [1]
+
+
+def test_head_context_only_snapshots_locals_for_readers():
+    seen = {}
+
+    def reads_value(self_obj, ci, *args):
+        seen["ctx"] = dict(ci._ctx)
+
+    def reads_locals(self_obj, ci, *args):
+        seen["locals"] = ci.get_locals()
+
+    src = "def f(self, x):\n    return x\n"
+    f = _weave_function(src, InjectorSpec(mixin_cls=object, callback=reads_value, method="f", at=At(type=TYPE.HEAD), uses_locals=False))
+    f(None, 3)
+    assert seen["ctx"]["locals"] == {}
+
+    f = _weave_function(src, InjectorSpec(mixin_cls=object, callback=reads_locals, method="f", at=At(type=TYPE.HEAD)))
+    f(None, 3)
+    assert seen["locals"]["x"] == 3
+
+
+def test_lone_const_action_injector_is_woven_without_dispatch(monkeypatch):
+    def boom(*args, **kwargs):
+        raise AssertionError("dispatch should be skipped")
+
+    monkeypatch.setattr("mixpy.runtime.dispatch_injectors", boom)
+    spec = InjectorSpec(mixin_cls=object, callback=lambda self_obj, ci, *a: None, method="f",
+                        at=At(type=TYPE.PARAMETER, name="x"), const_action=("set_value", 7))
+    f = _weave_function("def f(self, x):\n    return x\n", spec)
+
+    assert f(None, 1) == 7
+
+
+def test_node_index_matches_node_visitor_order_and_parents():
+    import ast
+
+    from mixpy.handlers import NodeIndex, invalidate_index, node_index
+
+    fn = ast.parse("def f(self):\n    if self.a:\n        return g(1, h(2))\n    return None\n").body[0]
+    seen = []
+
+    class Walk(ast.NodeVisitor):
+        def generic_visit(self, node):
+            seen.append(node)
+            super().generic_visit(node)
+
+    Walk().visit(fn)
+    idx = NodeIndex(fn)
+    assert idx.order == seen
+    ret = idx.of_type(ast.Return)[0]
+    assert isinstance(idx.parent(ret), ast.If)
+    assert node_index(fn) is node_index(fn)
+    cached = node_index(fn)
+    invalidate_index(fn)
+    assert node_index(fn) is not cached
+
+
+def test_const_rewrite_only_touches_body_nodes():
+    def cb(self_obj, ci):
+        ci.set_value(ci.get_value() * 10)
+
+    spec = InjectorSpec(mixin_cls=object, callback=cb, method="f", at=At(type=TYPE.CONST, name=1))
+    f = _weave_function("def f(self, x=1):\n    return x + 1\n", spec)
+
+    # the default stays 1; only the literal in the body is replaced
+    assert f(None) == 11
+
+
+def test_attr_path_is_matches_whole_dotted_paths_only():
+    import ast
+
+    from mixpy.location_utils import _attr_path_is
+
+    node = ast.parse("self.stats.hp", mode="eval").body
+    assert _attr_path_is(node, ("self", "stats", "hp"))
+    assert not _attr_path_is(node, ("stats", "hp"))
+    assert not _attr_path_is(node, ("other", "stats", "hp"))
+    assert not _attr_path_is(node, ("self", "stats", "hp", "x"))
+
+
+def test_location_tables_are_memoized_on_the_node_index():
+    import ast
+
+    from mixpy.handlers import invalidate_index
+    from mixpy.location_utils import _fn_tables
+
+    fn = ast.parse("def f(self):\n    a = 1\n    return a\n").body[0]
+    stmt_idx = _fn_tables(fn)[1]
+    assert _fn_tables(fn)[1] is stmt_idx
+    assert [stmt_idx[id(s)] for s in fn.body] == [0, 1]
+    invalidate_index(fn)
+    assert _fn_tables(fn)[1] is not stmt_idx
+
+
+def test_trivial_locations_skip_the_location_tables():
+    import ast
+
+    from mixpy.builtin_handlers import install_builtin_handlers
+    from mixpy.handlers import get_handler, node_index
+    from mixpy.location import LineSpec
+    from mixpy.location_utils import apply_location
+
+    install_builtin_handlers()
+    fn = ast.parse("def f(self):\n    return self.step(1)\n").body[0]
+
+    def picked(loc):
+        at = At(type=TYPE.INVOKE, name="self.step", location=loc)
+        return apply_location(fn, get_handler(TYPE.INVOKE).find(fn, at), at)
+
+    assert Loc()._is_trivial and not Loc(line=LineSpec(lineno=2))._is_trivial
+    assert len(picked(Loc(condition=When("x", OP.GT, 0)))) == 1
+    assert len(picked(Loc(ordinal=0))) == 1
+    assert picked(Loc(ordinal=1)) == []
+    assert "stmt_idx" not in node_index(fn).memo
+    assert len(picked(Loc(line=LineSpec(lineno=2)))) == 1
+    assert "stmt_idx" in node_index(fn).memo
+
+
+def test_exception_is_exposed_on_ci_without_building_the_context():
+    from mixpy.introspect import uses_context, uses_locals
+
+    seen = {}
+
+    def cb(self_obj, ci):
+        seen["exc"] = ci.exception
+        ci.cancel(result=-1)
+
+    spec = InjectorSpec(mixin_cls=object, callback=cb, method="f", at=At(type=TYPE.EXCEPTION),
+                        uses_context=uses_context(cb), uses_locals=uses_locals(cb))
+    f = _weave_function("def f(self):\n    raise KeyError('k')\n", spec)
+
+    assert f(None) == -1
+    assert isinstance(seen["exc"], KeyError)
+    assert spec.uses_context is False
+
+
+def test_noop_injectors_are_left_out_of_site_maps(monkeypatch):
+    def cb(self_obj, ci):
+        return None
+
+    at = At(type=TYPE.HEAD, name=None)
+    noop = InjectorSpec(mixin_cls=object, callback=cb, method="tick", at=at, noop=True)
+    live = InjectorSpec(mixin_cls=object, callback=cb, method="step", at=at)
+    monkeypatch.setattr(weave, "REGISTRY", _fake_registry({
+        ("demo_game.player.Player", "tick"): [noop],
+        ("demo_game.player.Player", "step"): [live],
+    }))
+
+    assert [k[1] for k in build_injector_map("demo_game.player")] == ["step"]